@@ -0,0 +1,63 @@
+"""Image assets for Fire Up! game.
+
+Every image file is decoded once per process, and recoloured variants of it
+(palette swaps, e.g. for the secret theme) are made from the decoded image
+the first time they are asked for.
+
+Tk stops showing an image as soon as its ``PhotoImage`` is garbage
+collected, so the cache keeps every ``PhotoImage`` it has made alive for as
+long as the cache itself lives.
+"""
+import os
+
+from PIL import Image, ImageColor, ImageTk
+
+ASSET_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def palette_swap(image, palette):
+    """Recolour an image, replacing every colour in palette with its swap."""
+    image = image.convert("RGBA")
+    swaps = {ImageColor.getrgb(old)[:3]: ImageColor.getrgb(new)[:3]
+             for old, new in palette}
+    swapped = Image.new("RGBA", image.size)
+    swapped.putdata([swaps.get(pixel[:3], pixel[:3]) + (pixel[3],)
+                     for pixel in image.getdata()])
+    return swapped
+
+
+class AssetCache:
+    """Decoded images and their Tk images, made once each."""
+
+    def __init__(self, directory=ASSET_DIRECTORY):
+        """Initialize empty cache loading files from directory."""
+        self.directory = directory
+        self.images = {}  # (filename, palette) -> PIL image
+        self.photos = {}  # (filename, palette) -> PhotoImage
+
+    @staticmethod
+    def _key(filename, palette):
+        """Get the cache key of an image and palette."""
+        if palette:
+            return filename, tuple(sorted(palette.items()))
+        return filename, None
+
+    def image(self, filename, palette=None):
+        """Get an image, recoloured with palette if one is given."""
+        key = self._key(filename, palette)
+        if key not in self.images:
+            if key[1] is None:
+                with Image.open(os.path.join(self.directory, filename)) as f:
+                    f.load()
+                    self.images[key] = f
+            else:
+                self.images[key] = palette_swap(self.image(filename), key[1])
+        return self.images[key]
+
+    def photo(self, filename, palette=None):
+        """Get a Tk image of an image, which stays alive with the cache."""
+        key = self._key(filename, palette)
+        if key not in self.photos:
+            self.photos[key] = ImageTk.PhotoImage(
+                self.image(filename, palette))
+        return self.photos[key]
@@ -0,0 +1,240 @@
+"""Monte-Carlo balance runner for Fire Up! game.
+
+Plays many headless games on every CPU core, with a scripted or random
+player, and reports the distribution of scores, how long games survive and
+how often every enemy kind spawns, for normal and secret mode. Pass
+--difficulty with an edited copy of difficulty.json to see what a change
+of chances or thresholds does before shipping it.
+
+Policies:
+- still: never moves
+- random: moves in a random direction now and then
+- dodge: moves to whichever neighbouring cell has the fewest enemies
+  around it
+
+Usage: python balance.py [--games N] [--mode MODE] [--policy POLICY]
+                         [--difficulty FILE] [--smart-trackers]
+                         [--workers N] [--json FILE]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from difficulty import DIFFICULTY_FILE, load_difficulty
+from simulation import Simulation
+
+MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+def still(sim, rng):
+    """Never move."""
+    return None
+
+
+def random_walk(sim, rng):
+    """Move in a random direction about once a second."""
+    if rng.random() < 1 / 30:
+        return rng.choice(MOVES)
+    return None
+
+
+def danger(sim, x, y, reach=2):
+    """Count the occupied cells within reach of a cell."""
+    occupied = sim.occupancy.occupied
+    return sum(occupied(x + dx, y + dy)
+               for dx in range(-reach, reach + 1)
+               for dy in range(-reach, reach + 1))
+
+
+def dodge(sim, rng):
+    """Move to the neighbouring cell with the fewest enemies around it."""
+    x, y = sim.player_coordinates
+    width, height = sim.grid_dimensions
+    best, best_danger = None, danger(sim, x, y)
+    for dx, dy in MOVES:
+        # Same bounds as Simulation.move_player
+        if 0 <= x + dx < width and 2 <= y + dy < height:
+            move_danger = danger(sim, x + dx, y + dy)
+            if move_danger < best_danger:
+                best, best_danger = (dx, dy), move_danger
+    return best
+
+
+POLICIES = {
+    "still": still,
+    "random": random_walk,
+    "dodge": dodge
+}
+
+
+def play(game):
+    """Play one headless game, returning its result."""
+    seed, mode, policy_name, max_ticks, difficulty_file, smart = game
+    sim = Simulation(secret=mode == "secret", seed=seed,
+                     difficulty=load_difficulty(mode, difficulty_file),
+                     smart_trackers=smart)
+    policy = POLICIES[policy_name]
+    # The player's choices must not change what the game draws
+    rng = random.Random(f"{seed}-policy")
+
+    spawns = Counter()
+    spawn_enemy = sim.spawn_enemy
+
+    def counted_spawn(kind, **stats):
+        spawns[kind] += 1
+        spawn_enemy(kind, **stats)
+    sim.spawn_enemy = counted_spawn
+
+    while sim.tick < max_ticks:
+        move = policy(sim, rng)
+        if move is not None:
+            sim.move_player(*move)
+        if not sim.step():
+            break
+
+    return {
+        "seed": seed,
+        "score": round(sim.score),
+        "ticks": sim.tick,
+        "game_over": sim.game_over,
+        "peak_enemies": sim.peak_enemies,
+        "spawns": dict(spawns)
+    }
+
+
+def run(games, mode, policy, max_ticks, difficulty_file, workers, seed=0,
+        smart_trackers=False):
+    """Play games in parallel, returning their results in seed order."""
+    jobs = [(seed + i, mode, policy, max_ticks, difficulty_file,
+             smart_trackers)
+            for i in range(games)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, games // (4 * (workers or os.cpu_count() or 1)))
+        return list(executor.map(play, jobs, chunksize=chunksize))
+
+
+def percentile(values, percent):
+    """Get a percentile of sorted values."""
+    return values[round((len(values) - 1) * percent / 100)]
+
+
+def summarise(results, max_ticks):
+    """Summarise the results of a batch of games."""
+    scores = sorted(result["score"] for result in results)
+    ticks = sorted(result["ticks"] for result in results)
+    total_ticks = sum(ticks)
+
+    spawns = Counter()
+    for result in results:
+        spawns.update(result["spawns"])
+
+    # Fraction of games still going at evenly spaced ticks
+    checkpoints = [max_ticks * i // 10 for i in range(11)]
+    survival = {tick: sum(t >= tick for t in ticks) / len(ticks)
+                for tick in checkpoints}
+
+    return {
+        "games": len(results),
+        "capped": sum(not result["game_over"] for result in results),
+        "score": {
+            "mean": statistics.fmean(scores),
+            "stdev": statistics.pstdev(scores),
+            "min": scores[0],
+            "p10": percentile(scores, 10),
+            "p50": percentile(scores, 50),
+            "p90": percentile(scores, 90),
+            "p99": percentile(scores, 99),
+            "max": scores[-1]
+        },
+        "survival": survival,
+        "spawns_per_1000_ticks": {
+            kind: 1000 * count / max(total_ticks, 1)
+            for kind, count in sorted(spawns.items())},
+        "peak_enemies": statistics.fmean(
+            result["peak_enemies"] for result in results)
+    }
+
+
+def histogram(values, bins=10, width=40):
+    """Get the lines of a text histogram of values."""
+    low, high = min(values), max(values)
+    size = max(1, -(-(high - low + 1) // bins))
+    counts = Counter((value - low) // size for value in values)
+    most = max(counts.values())
+    return [f"  {low + i * size:6d}-{low + (i + 1) * size - 1:<6d} "
+            f"{'#' * round(width * counts[i] / most)} {counts[i]}"
+            for i in range(bins) if low + i * size <= high]
+
+
+def report(mode, summary, scores):
+    """Print the summary of a mode."""
+    score = summary["score"]
+    print(f"\n{mode}: {summary['games']} games "
+          f"({summary['capped']} reached the tick limit)")
+    print(f"  score mean {score['mean']:.1f} stdev {score['stdev']:.1f} "
+          f"min {score['min']} p10 {score['p10']} p50 {score['p50']} "
+          f"p90 {score['p90']} p99 {score['p99']} max {score['max']}")
+    for line in histogram(scores):
+        print(line)
+
+    print("  survival:")
+    for tick, alive in summary["survival"].items():
+        print(f"    tick {tick:6d}  {100 * alive:5.1f}%")
+
+    print(f"  spawns per 1000 ticks (peak enemies "
+          f"{summary['peak_enemies']:.1f}):")
+    for kind, rate in summary["spawns_per_1000_ticks"].items():
+        print(f"    {kind:9s} {rate:7.2f}")
+
+
+def main():
+    """Run the games and report on them."""
+    parser = argparse.ArgumentParser(description="Fire Up! balance runner")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--mode", default="both",
+                        choices=("normal", "secret", "both"))
+    parser.add_argument("--policy", default="dodge", choices=POLICIES)
+    parser.add_argument("--max-ticks", type=int, default=10000,
+                        help="stop games that last this long")
+    parser.add_argument("--difficulty", default=DIFFICULTY_FILE,
+                        help="difficulty file to play with")
+    parser.add_argument("--smart-trackers", action="store_true",
+                        help="trackers route around other enemies")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to use, all cores by default")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game")
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the summaries to FILE")
+    args = parser.parse_args()
+
+    modes = ("normal", "secret") if args.mode == "both" else (args.mode,)
+    summaries = {}
+    for mode in modes:
+        start = time.perf_counter()
+        results = run(args.games, mode, args.policy, args.max_ticks,
+                      os.path.abspath(args.difficulty), args.workers,
+                      args.seed, args.smart_trackers)
+        elapsed = time.perf_counter() - start
+
+        summaries[mode] = summarise(results, args.max_ticks)
+        report(mode, summaries[mode],
+               [result["score"] for result in results])
+        print(f"  {args.games / elapsed:.0f} games/s, "
+              f"{sum(r['ticks'] for r in results) / elapsed:.0f} ticks/s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"policy": args.policy,
+                       "difficulty": args.difficulty,
+                       "max_ticks": args.max_ticks,
+                       "modes": summaries}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""Benchmarks for the hot paths of Fire Up! game.
+
+Runs without a display. Covers:
+- the enemy update and collision loop of a Simulation, for several enemy
+  populations, grid sizes and both enemy backends, up to tens of thousands
+  of enemies on a 500x500 arena
+- move, check_boundaries and check_collision of every enemy class
+- the memory taken by one enemy of every class
+- Simulation.difficulty_change
+- searching the trackers' pursuit flow field, plain and avoiding enemies
+- Game.update_circles and Game.draw_circles of the main menu
+- rendering a frame with either renderer onto a stub canvas that counts
+  the Tk calls it would have made, for the window's grid and for a larger
+  arena seen through the 20x20 view
+
+Results are written as JSON so runs from different commits can be
+compared.
+
+Usage: python benchmark.py [--quick] [--output FILE] [--compare FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+
+import enemy_store
+from pathing import FlowField
+from renderer import RENDERERS
+from simulation import Simulation
+
+POPULATIONS = (10, 100, 1000)
+GRID_SIZES = (20, 50, 100)
+# Stress test populations, on an arena of STRESS_GRID x STRESS_GRID
+STRESS_POPULATIONS = (10000, 30000)
+STRESS_GRID = 500
+# The arrays backend needs NumPy
+BACKENDS = (("objects", "arrays") if enemy_store.np is not None
+            else ("objects",))
+ENEMY_KINDS = ("basic", "speedy", "leaper", "helix", "sine", "exploder",
+               "tracker")
+
+
+class StubCanvas:
+    """Stands in for a Tk canvas, counting the calls made to it."""
+
+    def __init__(self):
+        """Initialize stub with no items."""
+        self.calls = Counter()
+        self.items = 0
+        self.tags = {}  # tag -> ids of the items with it
+
+    def _create(self, kind, tags=None):
+        """Count creating an item and give it an id."""
+        self.calls[f"create_{kind}"] += 1
+        self.items += 1
+        if tags is not None:
+            self.tags.setdefault(tags, []).append(self.items)
+        return self.items
+
+    def create_rectangle(self, *args, tags=None, **kwargs):
+        return self._create("rectangle", tags)
+
+    def create_text(self, *args, tags=None, **kwargs):
+        return self._create("text", tags)
+
+    def create_line(self, *args, tags=None, **kwargs):
+        return self._create("line", tags)
+
+    def create_oval(self, *args, tags=None, **kwargs):
+        return self._create("oval", tags)
+
+    def create_image(self, *args, tags=None, **kwargs):
+        return self._create("image", tags)
+
+    def find_withtag(self, tag):
+        return tuple(self.tags.get(tag, ()))
+
+    def coords(self, *args):
+        self.calls["coords"] += 1
+
+    def itemconfigure(self, *args, **kwargs):
+        self.calls["itemconfigure"] += 1
+
+    itemconfig = itemconfigure
+
+    def tag_lower(self, *args):
+        self.calls["tag_lower"] += 1
+
+    def tag_raise(self, *args):
+        self.calls["tag_raise"] += 1
+
+    def delete(self, *args):
+        self.calls["delete"] += 1
+
+
+class StubPhoto:
+    """Stands in for a Tk image, counting pastes on its canvas."""
+
+    def __init__(self, canvas):
+        """Initialize stub for a stub canvas."""
+        self.canvas = canvas
+
+    def paste(self, image):
+        self.canvas.calls["paste"] += 1
+
+
+def measure(function, duration, repeats=3):
+    """Get the best calls per second of function over a few runs."""
+    best = 0
+    for _ in range(repeats):
+        calls = 0
+        elapsed = 0.0
+        while elapsed < duration:
+            start = time.perf_counter()
+            function()
+            elapsed += time.perf_counter() - start
+            calls += 1
+        best = max(best, calls / elapsed)
+    return best
+
+
+def populated_simulation(grid_size, population, backend, seed=0):
+    """Make a secret mode simulation with a population of enemies."""
+    sim = Simulation(grid_dimensions=(grid_size, grid_size), secret=True,
+                     seed=seed, enemy_backend=backend)
+    refill(sim, population)
+    return sim
+
+
+def refill(sim, population):
+    """Spawn enemies of every kind until the population is reached."""
+    kinds = 0
+    while sim.enemy_count() < population:
+        kind = ENEMY_KINDS[kinds % len(ENEMY_KINDS)]
+        if kind == "tracker":
+            sim.spawn_enemy(kind, track_delay=2, max_moves=1000)
+        else:
+            sim.spawn_enemy(kind)
+        kinds += 1
+
+
+def bench_update_loop(duration):
+    """Ticks per second of the enemy update and collision loop."""
+    results = []
+    sizes = [(grid_size, population) for grid_size in GRID_SIZES
+             for population in POPULATIONS]
+    sizes += [(STRESS_GRID, population) for population in STRESS_POPULATIONS]
+    for backend in BACKENDS:
+        for grid_size, population in sizes:
+            sim = populated_simulation(grid_size, population, backend)
+
+            def tick():
+                # Keep the population up, outside the timed ticks
+                refill(sim, population)
+                start = time.perf_counter()
+                for _ in range(10):
+                    sim.occupancy.occupied(*sim.player_coordinates)
+                    sim.update_enemies()
+                tick.elapsed += time.perf_counter() - start
+            tick.elapsed = 0.0
+
+            calls = 0
+            while tick.elapsed < duration:
+                tick()
+                calls += 10
+            results.append({
+                "name": "update_loop",
+                "params": {"backend": backend, "grid": grid_size,
+                           "population": population},
+                "ops_per_sec": calls / tick.elapsed
+            })
+    return results
+
+
+def bench_enemy_methods(duration):
+    """Calls per second of the methods of every enemy class."""
+    results = []
+    player = (10, 10)
+    for kind, enemy_class in Simulation.ENEMY_CLASSES.items():
+        for direction in ("U", "L"):
+            stats = ({"track_delay": 2, "max_moves": 10}
+                     if kind == "tracker" else {})
+            enemy_instance = enemy_class(direction=direction,
+                                         coordinate_bounds=(0, 20),
+                                         grid_size=15, **stats)
+            if kind == "tracker":
+                enemy_instance.set_target(player)
+
+            for method_name, args in (("move", ()),
+                                      ("check_boundaries", ()),
+                                      ("check_collision", (player,))):
+                method = getattr(enemy_instance, method_name)
+
+                def batch(method=method, args=args):
+                    for _ in range(1000):
+                        method(*args)
+                results.append({
+                    "name": f"enemy.{enemy_class.__name__}.{method_name}",
+                    "params": {"direction": direction},
+                    "ops_per_sec": measure(batch, duration) * 1000
+                })
+    return results
+
+
+def bench_enemy_memory(duration):
+    """Bytes allocated per enemy of every class."""
+    results = []
+    count = 1000
+    for kind, enemy_class in Simulation.ENEMY_CLASSES.items():
+        stats = ({"track_delay": 2, "max_moves": 10}
+                 if kind == "tracker" else {})
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        enemies = [enemy_class(direction="U", coordinate_bounds=(0, 20),
+                               grid_size=15, **stats)
+                   for _ in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del enemies
+        results.append({
+            "name": f"enemy.{enemy_class.__name__}.memory",
+            "params": {},
+            "bytes_per_enemy": allocated / count
+        })
+    return results
+
+
+def bench_difficulty_change(duration):
+    """Calls per second of Simulation.difficulty_change."""
+    results = []
+    for secret in (False, True):
+        sim = Simulation(secret=secret, seed=0)
+
+        def batch():
+            for _ in range(1000):
+                sim.difficulty_change()
+                sim.score += 0.1
+        results.append({
+            "name": "difficulty_change",
+            "params": {"secret": secret},
+            "ops_per_sec": measure(batch, duration) * 1000
+        })
+    return results
+
+
+def bench_pursuit(duration):
+    """Searches per second of the pursuit flow field."""
+    results = []
+    for grid_size in GRID_SIZES:
+        for smart in (False, True):
+            sim = populated_simulation(grid_size, grid_size, "objects")
+            field = FlowField(sim.grid_dimensions,
+                              sim.occupancy if smart else None)
+            field.update(sim.player_coordinates)
+            results.append({
+                "name": "pursuit_search",
+                "params": {"grid": grid_size, "smart": smart},
+                "ops_per_sec": measure(field.search, duration)
+            })
+    return results
+
+
+def bench_update_circles(duration):
+    """Calls per second of the main menu's update and draw of circles."""
+    # Tk is only needed to show the menu, so skip Game.__init__
+    from game_solution import Game
+    game = Game.__new__(Game)
+    game.WIDTH = game.HEIGHT = 300
+    game.MINCIRCLERADIUS = 1
+    game.MAXCIRCLERADIUS = 20
+    game.CIRCLE_RADII = game.build_circle_radii()
+    game.DMRRED = "#582c1c"
+    game.DMRREDACTIVE = "#623b20"
+    game.circles = list()
+    game.create_circles()
+    game.canvas = StubCanvas()
+    game.logo = None
+    game.logo_item = None
+
+    def update_batch():
+        for _ in range(100):
+            game.update_circles()
+
+    frames = 0
+
+    def draw_batch():
+        nonlocal frames
+        for _ in range(100):
+            game.update_circles()
+            game.draw_circles()
+        frames += 100
+
+    # Create the items before counting calls
+    game.draw_circles()
+    game.canvas.calls.clear()
+    results = [{
+        "name": "update_circles",
+        "params": {"circles": len(game.circles)},
+        "ops_per_sec": measure(update_batch, duration) * 100
+    }, {
+        "name": "draw_circles",
+        "params": {"circles": len(game.circles)},
+        "ops_per_sec": measure(draw_batch, duration) * 100
+    }]
+    results[-1]["calls_per_frame"] = {
+        name: count / frames for name, count in game.canvas.calls.items()}
+    return results
+
+
+def bench_render(duration):
+    """Frames per second and Tk calls per frame of the renderers."""
+    results = []
+    for renderer_name, renderer_class in RENDERERS.items():
+        for backend in BACKENDS:
+            for arena in (20, 100):
+                for population in POPULATIONS:
+                    sim = populated_simulation(arena, population, backend)
+                    canvas = StubCanvas()
+                    renderer = renderer_class(canvas, (20, 20), sim.cell_size,
+                                              sim.grid_dimensions)
+                    # No Tk image can be made without a display
+                    if renderer_name == "canvas":
+                        renderer.grid_photo = object()
+                        renderer.sprite_photos = (
+                            [object()] * len(renderer.atlas.images))
+                    else:
+                        renderer.photo = StubPhoto(canvas)
+                    renderer.build("#ff5722", "#ff8552", "#ff5722")
+
+                    frames = 0
+
+                    def frame():
+                        nonlocal frames
+                        refill(sim, population)
+                        sim.update_enemies()
+                        renderer.begin_frame()
+                        renderer.follow(*sim.player_coordinates)
+                        renderer.draw_player(*sim.player_coordinates)
+                        sim.display_enemies(renderer, renderer.viewport())
+                        renderer.draw_score(round(sim.score))
+                        renderer.end_frame()
+                        sim.score += 0.1
+                        frames += 1
+
+                    # Warm up the sprite pool before counting calls
+                    for _ in range(20):
+                        frame()
+                    canvas.calls.clear()
+                    frames = 0
+                    fps = measure(frame, duration)
+                    results.append({
+                        "name": "render_frame",
+                        "params": {"renderer": renderer_name,
+                                   "backend": backend, "arena": arena,
+                                   "population": population},
+                        "ops_per_sec": fps,
+                        "calls_per_frame": {
+                            name: count / frames
+                            for name, count in canvas.calls.items()}
+                    })
+    return results
+
+
+def git_commit():
+    """Get the current commit, if there is one."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metric_of(result):
+    """Get the name of the value a result measured."""
+    return "ops_per_sec" if "ops_per_sec" in result else "bytes_per_enemy"
+
+
+def format_result(result):
+    """Format a result as one line."""
+    if metric_of(result) == "ops_per_sec":
+        value = f"{result['ops_per_sec']:14.0f}/s"
+    else:
+        value = f"{result['bytes_per_enemy']:14.0f} B"
+    return f"{value}  {result['name']} {result['params']}"
+
+
+def compare(results, filename):
+    """Print how results changed since an earlier results file."""
+    with open(filename, 'r') as f:
+        previous = json.load(f)
+    old = {(r["name"], json.dumps(r["params"], sort_keys=True)): r
+           for r in previous["results"]}
+    print(f"\nCompared with {filename} ({previous.get('commit')}):")
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        metric = metric_of(result)
+        if metric in old.get(key, {}):
+            ratio = result[metric] / old[key][metric]
+            print(f"  {ratio:6.2f}x  {result['name']} {result['params']}")
+
+
+def main():
+    """Run every benchmark and save the results."""
+    parser = argparse.ArgumentParser(description="Fire Up! benchmarks")
+    parser.add_argument("--quick", action="store_true",
+                        help="shorter runs, less precise")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="earlier results to compare against")
+    args = parser.parse_args()
+
+    duration = 0.05 if args.quick else 0.3
+    results = []
+    for bench in (bench_update_loop, bench_enemy_methods,
+                  bench_enemy_memory, bench_difficulty_change,
+                  bench_pursuit, bench_update_circles, bench_render):
+        for result in bench(duration):
+            print(format_result(result))
+            results.append(result)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results
+        }, f, indent=1)
+    print(f"Results: {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
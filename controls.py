@@ -0,0 +1,95 @@
+"""Keyboard input for Fire Up! game.
+
+Every key press goes through one dispatcher, which looks its keysym up in
+a table built from the keybinds once, whenever they change. Moves are not
+applied the moment Tk delivers them but collected into a small ring buffer,
+and the game takes at most a fixed number of them before every simulation
+tick, so moves land on ticks the same way however fast keys arrive, and a
+replay of the ticks is a replay of the game.
+
+Holding a key down makes the OS repeat it. A repeated press is dropped
+while the move it repeats is still waiting in the buffer, so a held key
+moves the player at most once per tick instead of flooding the buffer.
+"""
+from collections import deque
+
+# Action -> (dx, dy) of every move
+MOVES = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0)
+}
+
+# Keys that cannot be rebound, keysym -> action
+FIXED_KEYS = {
+    "p": "pause",
+    "F3": "toggle_profiler",
+    "F4": "dump_profile"
+}
+
+
+def keysym_table(keybinds):
+    """Build the keysym -> action table of a set of keybinds."""
+    table = dict(FIXED_KEYS)
+    for action, key in keybinds.items():
+        table[key] = action
+        # Letters move the player with caps lock or shift too
+        if len(key) == 1:
+            table[key.upper()] = action
+    return table
+
+
+class InputQueue:
+    """Ring buffer of moves waiting for the next tick."""
+
+    def __init__(self, keybinds, capacity=8, moves_per_tick=1):
+        """Initialize an empty queue for a set of keybinds."""
+        self.actions = keysym_table(keybinds)
+        self.buffer = deque(maxlen=capacity)  # Oldest moves are dropped
+        self.moves_per_tick = moves_per_tick
+        self.held = set()  # keysyms down right now
+        self.released = {}  # keysym -> time it was last released
+
+    def set_keybinds(self, keybinds):
+        """Rebuild the keysym table for new keybinds."""
+        self.actions = keysym_table(keybinds)
+
+    def action(self, keysym):
+        """Get the action bound to a keysym, if any."""
+        return self.actions.get(keysym)
+
+    def press(self, keysym, time=None):
+        """
+        Handle a key press, queueing it if it is a move.
+        Returns the action of the key, or None for unbound keys.
+        """
+        action = self.actions.get(keysym)
+        if action is None:
+            return None
+
+        # Repeats come as presses without a release, or on X11 as a
+        # release and press at the same time
+        repeat = (keysym in self.held or
+                  (time is not None and self.released.get(keysym) == time))
+        self.held.add(keysym)
+
+        if action in MOVES:
+            if not (repeat and action in self.buffer):
+                self.buffer.append(action)
+        return action
+
+    def release(self, keysym, time=None):
+        """Handle a key release."""
+        self.held.discard(keysym)
+        self.released[keysym] = time
+
+    def moves(self):
+        """Take the (dx, dy) of the moves for this tick."""
+        buffer = self.buffer
+        for _ in range(min(self.moves_per_tick, len(buffer))):
+            yield MOVES[buffer.popleft()]
+
+    def clear(self):
+        """Forget every waiting move."""
+        self.buffer.clear()
@@ -0,0 +1,124 @@
+"""Difficulty curves for Fire Up! game.
+
+The spawn chance of every enemy kind is a curve over the score (or the
+tick). A step curve is worked out from its formula and a list of points is
+searched with bisect, so changing difficulty during a game costs next to
+nothing per kind, only when the level changes, and loading a mode builds
+nothing per level.
+
+Curves come from difficulty.json, with one entry per game mode. The file
+ships with the game and is the only place the curves are defined, so a
+missing file is an error rather than a reason to play with other numbers.
+Each enemy kind is either a step curve,
+
+    {"chance": 40, "threshold": 8}
+
+which starts at chance and drops by one every threshold points of score
+(the first drop at score 0), never going under the mode's "min_chance"; or a
+list of points,
+
+    {"points": [[0, 40], [100, 20], [500, 5]]}
+
+where the chance is the one of the last point at or below the level. A kind
+with only a chance never changes. The chance is one in that many ticks.
+
+Every compiled mode has a digest of its entry, so a replay can tell
+whether it is being re-run with the curves it was played with.
+"""
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from functools import lru_cache
+
+DIFFICULTY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               'difficulty.json')
+
+
+class Curve:
+    """Chance of one enemy kind, as the levels it changes at."""
+
+    def __init__(self, points):
+        """Initialize curve from (level, chance) points, sorted by level."""
+        self.levels = [level for level, _ in points]
+        self.chances = [chance for _, chance in points]
+
+    @classmethod
+    def from_config(cls, config, min_chance):
+        """Compile a curve from its difficulty.json entry."""
+        if "points" in config:
+            return cls(sorted(config["points"]))
+
+        threshold = config.get("threshold")
+        if threshold is None:
+            return cls([(0, config["chance"])])
+        return StepCurve(config["chance"], threshold, min_chance)
+
+    def chance_at(self, level):
+        """Get the chance of the last point at or below a level."""
+        # Levels before the first point use its chance
+        index = max(bisect_right(self.levels, level) - 1, 0)
+        return self.chances[index]
+
+
+class StepCurve:
+    """Chance of one enemy kind, dropping by one every threshold levels."""
+
+    def __init__(self, chance, threshold, min_chance):
+        """Initialize curve starting at chance, never going under min_chance."""
+        self.chance = chance
+        self.threshold = threshold
+        self.min_chance = min_chance
+
+    def chance_at(self, level):
+        """Get the chance at a level."""
+        return max(self.min_chance,
+                   self.chance - (level // self.threshold + 1))
+
+
+class Difficulty:
+    """The curves of every enemy kind in a game mode."""
+
+    def __init__(self, starting_chances, curves, over="score", digest=None):
+        """
+        Initialize difficulty from starting chances and curves.
+        digest identifies the config the curves were compiled from.
+        """
+        self.starting_chances = starting_chances
+        self.curves = curves
+        self.over = over
+        self.digest = digest
+
+    @classmethod
+    def from_config(cls, config):
+        """Compile the difficulty of a mode from its difficulty.json entry."""
+        min_chance = config.get("min_chance", 1)
+        enemies = config["enemies"]
+        curves = {kind: Curve.from_config(curve, min_chance)
+                  for kind, curve in enemies.items()}
+        # Before the first level is reached, every kind starts at its chance
+        starting_chances = {
+            kind: curve["chance"] if "chance" in curve
+            else curves[kind].chance_at(0)
+            for kind, curve in enemies.items()}
+        digest = hashlib.sha256(
+            json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+        return cls(starting_chances, curves, config.get("over", "score"),
+                   digest)
+
+    def chances_at(self, level):
+        """Get the chance of every kind at a level."""
+        return {kind: curve.chance_at(level)
+                for kind, curve in self.curves.items()}
+
+
+def load_modes(filename=DIFFICULTY_FILE):
+    """Load every mode from file."""
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_difficulty(mode, filename=DIFFICULTY_FILE):
+    """Load and compile the difficulty of a mode, once per process."""
+    return Difficulty.from_config(load_modes(filename)[mode])
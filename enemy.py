@@ -8,80 +8,107 @@ Available enemies:
 - Sine: Modified helix creating wave pattern
 - Exploder: Creates explosion after delay
 - Tracker: Secret enemy that pursues the player
+
+Every enemy takes an optional ``rng`` (anything with ``randint`` and
+``choice``, such as ``random.Random``) so spawns can be reproduced from a
+seed. It defaults to the global ``random`` module.
+
+Enemies use ``__slots__`` and keep their coordinates as ``(x, y)`` tuples,
+so they compare equal to the player's coordinates and can be used as
+occupancy cells as they are.
+
+Enemies are recycled through an ``EnemyPool`` rather than made anew for
+every spawn: ``reset`` puts a culled enemy back to how a fresh one of its
+class would be, drawing the same random numbers as the constructor.
+
+Enemies are drawn from the sprites of ``sprites.py``; ``display`` only
+picks which one.
 """
 import random
-import math
+import sprites  # custom module
 
 
 class Enemy:
     """Base enemy class that defines common behavior and attributes."""
 
-    def __init__(self, direction, colour, coordinate_bounds, grid_size,
-                 time_to_move):
-        """Initialize base enemy with movement and display properties."""
-        self.direction_map = {
-            "U": (0, -1),
-            "D": (0, 1),
-            "L": (-1, 0),
-            "R": (1, 0)
-        }
+    __slots__ = ("rng", "cell_size", "min_coord", "max_coord", "min_row",
+                 "max_row", "time_to_move", "move_gauge", "up_bound",
+                 "down_bound", "left_bound", "right_bound", "direction",
+                 "sprite", "coordinates", "stamped_cells")
+
+    DIRECTION_MAP = {
+        "U": (0, -1),
+        "D": (0, 1),
+        "L": (-1, 0),
+        "R": (1, 0)
+    }
+
+    def __init__(self, direction, sprite, coordinate_bounds, grid_size,
+                 time_to_move, rng=random, row_bounds=None):
+        """
+        Initialize base enemy with movement and display properties.
+        coordinate_bounds are the (min, max) columns of the grid, and
+        row_bounds its rows, the same as the columns by default.
+        """
+        self.rng = rng
         self.cell_size = grid_size
         self.min_coord, self.max_coord = coordinate_bounds
+        self.min_row, self.max_row = row_bounds or coordinate_bounds
         self.time_to_move = time_to_move
+        self.sprite = sprite
+        self.reset(direction)
+
+    def reset(self, direction):
+        """Respawn the enemy heading in direction, as if newly created."""
         self.move_gauge = 0
 
         # Boundary coordinates
-        self.up_bound = self.min_coord + 1
-        self.down_bound = self.max_coord + 1
+        self.up_bound = self.min_row + 1
+        self.down_bound = self.max_row + 1
         self.left_bound = self.min_coord - 1
         self.right_bound = self.max_coord + 1
 
         self.direction = direction
-        self.colour = colour
         self.coordinates = self._get_spawn_position()
 
+        # Cells last stamped into an occupancy grid
+        self.stamped_cells = ()
+
     def _get_spawn_position(self):
         """Calculate spawn position based on direction."""
         if self.direction == "U":
-            return [
-                random.randint(self.min_coord, self.max_coord),
+            return (
+                self.rng.randint(self.min_coord, self.max_coord),
                 self.down_bound
-            ]
+            )
         if self.direction == "D":
-            return [
-                random.randint(self.min_coord, self.max_coord),
+            return (
+                self.rng.randint(self.min_coord, self.max_coord),
                 self.up_bound
-            ]
+            )
         if self.direction == "L":
-            return [
+            return (
                 self.right_bound,
-                random.randint(self.min_coord + 2, self.max_coord)
-            ]
+                self.rng.randint(self.min_row + 2, self.max_row)
+            )
         if self.direction == "R":
-            return [
+            return (
                 self.left_bound,
-                random.randint(self.min_coord + 2, self.max_coord)
-            ]
+                self.rng.randint(self.min_row + 2, self.max_row)
+            )
 
-    def display(self, canvas):
-        """Display enemy on the canvas."""
+    def display(self, renderer):
+        """Display enemy through the renderer."""
         x, y = self.coordinates
-        canvas.create_rectangle(
-            x * self.cell_size,
-            y * self.cell_size,
-            (x + 1) * self.cell_size,
-            (y + 1) * self.cell_size,
-            fill=self.colour,
-            outline=''
-        )
+        renderer.draw_sprite(self, x, y, self.sprite)
 
     def move(self):
         """Update enemy position based on movement timer and direction."""
         if self.time_to_move == self.move_gauge:
-            dx, dy = self.direction_map[self.direction]
+            dx, dy = self.DIRECTION_MAP[self.direction]
             x = self.coordinates[0] + dx
             y = self.coordinates[1] + dy
-            self.coordinates = [x, y]
+            self.coordinates = (x, y)
             self.move_gauge = 0
         else:
             self.move_gauge += 1
@@ -90,6 +117,10 @@ class Enemy:
         """Check if enemy has collided with given coordinates."""
         return self.coordinates == coordinates
 
+    def cells(self):
+        """Get the cells the enemy collides with."""
+        return (self.coordinates,)
+
     def check_boundaries(self):
         """Check if enemy has moved beyond screen boundaries."""
         x, y = self.coordinates
@@ -106,95 +137,102 @@ class Enemy:
 class Basic(Enemy):
     """Basic enemy that moves in a straight line at normal speed."""
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    __slots__ = ()
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize basic enemy with default white color."""
-        super().__init__(direction, "white", coordinate_bounds, grid_size, 3)
+        super().__init__(
+            direction, sprites.BASIC, coordinate_bounds, grid_size, 3, rng,
+            row_bounds
+        )
 
 
 class Speedy(Enemy):
     """Fast enemy that moves at double the normal speed."""
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    __slots__ = ()
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize speedy enemy with pink color."""
         super().__init__(
-            direction, "#f1bbb0", coordinate_bounds, grid_size, 1
+            direction, sprites.SPEEDY, coordinate_bounds, grid_size, 1, rng,
+            row_bounds
         )
 
 
 class Leaper(Enemy):
     """Enemy that moves two grid spaces at a time."""
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    __slots__ = ()
+
+    DIRECTION_MAP = {
+        "U": (0, -2),
+        "D": (0, 2),
+        "L": (-2, 0),
+        "R": (2, 0)
+    }
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize leaper with double-step movement."""
         super().__init__(
-            direction, "#f1deb0", coordinate_bounds, grid_size, 2
+            direction, sprites.LEAPER, coordinate_bounds, grid_size, 2, rng,
+            row_bounds
         )
-        self.direction_map = {
-            "U": (0, -2),
-            "D": (0, 2),
-            "L": (-2, 0),
-            "R": (2, 0)
-        }
 
 
 class Exploder(Enemy):
     """Enemy that creates an explosive area effect after a delay."""
 
-    EXPLOSION_COLORS = ['#ff0000', '#ffbb00', '#fcff00', '#3dff00', '#00ffcc']
-    EXPLOSION_COLOR = "#ff8852"
+    __slots__ = ("explode_gauge", "exploded")
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    EXPLODE_TIME = sprites.EXPLODE_TIME
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize exploder with countdown mechanics."""
         super().__init__(
-            direction, "#000000", coordinate_bounds, grid_size, 3
+            direction, sprites.CHARGE[0], coordinate_bounds, grid_size, 3, rng,
+            row_bounds
         )
-        self.explode_time = 10
+
+    def reset(self, direction):
+        """Respawn the exploder with its countdown restarted."""
+        super().reset(direction)
         self.explode_gauge = 0
         self.exploded = False
 
     def move(self):
         """Handle both movement and explosion countdown."""
         if self.time_to_move == self.move_gauge:
-            dx, dy = self.direction_map[self.direction]
+            dx, dy = self.DIRECTION_MAP[self.direction]
             x = self.coordinates[0] + dx
             y = self.coordinates[1] + dy
-            self.coordinates = [x, y]
+            self.coordinates = (x, y)
             self.move_gauge = 0
 
             if not self.exploded:
-                if self.explode_gauge < self.explode_time:
+                if self.explode_gauge < self.EXPLODE_TIME:
                     self.explode_gauge += 1
-                if self.explode_gauge == self.explode_time:
+                if self.explode_gauge == self.EXPLODE_TIME:
                     self.exploded = True
         else:
             self.move_gauge += 1
 
-    def display(self, canvas):
+        # The explosion lasts until the next boundary check
+        if self.exploded:
+            self.explode_gauge += 1
+
+    def display(self, renderer):
         """Display the enemy, showing explosion charging or detonation."""
         x, y = self.coordinates
         if not self.exploded:
-            color_index = math.floor(
-                4 * (self.explode_gauge / self.explode_time)
-            )
-            self.colour = self.EXPLOSION_COLORS[color_index]
-            canvas.create_rectangle(
-                x * self.cell_size,
-                y * self.cell_size,
-                (x + 1) * self.cell_size,
-                (y + 1) * self.cell_size,
-                fill=self.colour,
-                outline=''
-            )
+            renderer.draw_sprite(self, x, y,
+                                 sprites.CHARGE[self.explode_gauge])
         else:
-            canvas.create_rectangle(
-                (x - 1) * self.cell_size,
-                (y - 1) * self.cell_size,
-                (x + 2) * self.cell_size,
-                (y + 2) * self.cell_size,
-                fill=self.EXPLOSION_COLOR,
-                outline=''
-            )
-            self.explode_gauge += 1
+            renderer.draw_sprite(self, x, y, sprites.BLAST)
 
     def check_collision(self, coordinates):
         """Check for collision with either the enemy or its explosion."""
@@ -204,9 +242,17 @@ class Exploder(Enemy):
         y_diff = abs(self.coordinates[1] - coordinates[1])
         return x_diff <= 1 and y_diff <= 1
 
+    def cells(self):
+        """Get the enemy cell, or the whole explosion area."""
+        if not self.exploded:
+            return (self.coordinates,)
+        x, y = self.coordinates
+        return tuple((x + dx, y + dy)
+                     for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
     def check_boundaries(self):
         """Check if enemy is out of bounds or explosion is complete."""
-        if self.exploded and self.explode_gauge > self.explode_time:
+        if self.exploded and self.explode_gauge > self.EXPLODE_TIME:
             return True
         x, y = self.coordinates
         if self.direction == 'U':
@@ -222,72 +268,81 @@ class Exploder(Enemy):
 class Helix(Enemy):
     """Enemy that creates a helix pattern with two moving points."""
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    __slots__ = ("offset", "max_offset", "offset_direction", "phase",
+                 "coordinates_list")
+
+    PERPENDICULAR_MAP = {
+        "U": ((1, 0), (-1, 0)),
+        "D": ((-1, 0), (1, 0)),
+        "L": ((0, -1), (0, 1)),
+        "R": ((0, 1), (0, -1))
+    }
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize helix movement parameters."""
         super().__init__(
-            direction, "#fefb7f", coordinate_bounds, grid_size, 4
+            direction, sprites.HELIX, coordinate_bounds, grid_size, 4, rng,
+            row_bounds
         )
+
+    def reset(self, direction):
+        """Respawn the helix with both points at the edge."""
+        super().reset(direction)
         self.offset = 0
         self.max_offset = 1
         self.offset_direction = 1
         self.phase = 0
 
-        self.perpendicular_map = {
-            "U": [(1, 0), (-1, 0)],
-            "D": [(-1, 0), (1, 0)],
-            "L": [(0, -1), (0, 1)],
-            "R": [(0, 1), (0, -1)]
-        }
-
-        self.coordinates_list = [[0, 0], [0, 0]]
+        self.coordinates_list = [(0, 0), (0, 0)]
         self._initialize_helix_points()
 
     def _initialize_helix_points(self):
         """Set initial positions for both helix points."""
-        offset = self.max_offset * random.choice([-1, 1])
+        offset = self.max_offset * self.rng.choice([-1, 1])
         if self.direction == "U":
-            self.coordinates = [
-                random.randint(self.min_coord, self.max_coord),
+            self.coordinates = (
+                self.rng.randint(self.min_coord, self.max_coord),
                 self.down_bound
-            ]
-            self.coordinates_list[1] = [
+            )
+            self.coordinates_list[1] = (
                 self.coordinates_list[1][0] + offset,
                 self.down_bound
-            ]
+            )
         elif self.direction == "D":
-            self.coordinates = [
-                random.randint(self.min_coord, self.max_coord),
+            self.coordinates = (
+                self.rng.randint(self.min_coord, self.max_coord),
                 self.up_bound
-            ]
-            self.coordinates_list[1] = [
+            )
+            self.coordinates_list[1] = (
                 self.coordinates_list[1][0] + offset,
                 self.up_bound
-            ]
+            )
         elif self.direction == "L":
-            self.coordinates = [
+            self.coordinates = (
                 self.right_bound,
-                random.randint(self.min_coord + 2, self.max_coord)
-            ]
-            self.coordinates_list[1] = [
+                self.rng.randint(self.min_row + 2, self.max_row)
+            )
+            self.coordinates_list[1] = (
                 self.right_bound,
                 self.coordinates_list[1][1] + offset
-            ]
+            )
         elif self.direction == "R":
-            self.coordinates = [
+            self.coordinates = (
                 self.left_bound,
-                random.randint(self.min_coord + 2, self.max_coord)
-            ]
-            self.coordinates_list[1] = [
+                self.rng.randint(self.min_row + 2, self.max_row)
+            )
+            self.coordinates_list[1] = (
                 self.left_bound,
                 self.coordinates_list[1][1] + offset
-            ]
+            )
         self.coordinates_list[0] = self.coordinates
 
     def move(self):
         """Update positions of both helix points."""
         if self.time_to_move == self.move_gauge:
-            base_dx, base_dy = self.direction_map[self.direction]
-            perp_offsets = self.perpendicular_map[self.direction]
+            base_dx, base_dy = self.DIRECTION_MAP[self.direction]
+            perp_offsets = self.PERPENDICULAR_MAP[self.direction]
             perp_dx1, perp_dy1 = perp_offsets[self.phase // 2]
             perp_dx2, perp_dy2 = perp_offsets[self.phase // 2]
 
@@ -306,31 +361,28 @@ class Helix(Enemy):
                 self.offset_direction *= -1
                 self.phase = (self.phase + 1) % 4
 
-            self.coordinates_list[0] = [round(x1), round(y1)]
-            self.coordinates_list[1] = [round(x2), round(y2)]
+            self.coordinates_list[0] = (round(x1), round(y1))
+            self.coordinates_list[1] = (round(x2), round(y2))
             self.coordinates = self.coordinates_list[0]
 
             self.move_gauge = 0
         else:
             self.move_gauge += 1
 
-    def display(self, canvas):
+    def display(self, renderer):
         """Display both points of the helix."""
-        for x, y in self.coordinates_list:
-            canvas.create_rectangle(
-                x * self.cell_size,
-                y * self.cell_size,
-                (x + 1) * self.cell_size,
-                (y + 1) * self.cell_size,
-                fill=self.colour,
-                outline=''
-            )
+        for point, (x, y) in enumerate(self.coordinates_list):
+            renderer.draw_sprite((self, point), x, y, self.sprite)
 
     def check_collision(self, coordinates):
         """Check if either helix point collides with given coordinates."""
         return (self.coordinates_list[0] == coordinates or
                 self.coordinates_list[1] == coordinates)
 
+    def cells(self):
+        """Get the cells of both helix points."""
+        return tuple(self.coordinates_list)
+
     def check_boundaries(self):
         """Check if both helix points are out of bounds."""
         x1, y1 = self.coordinates_list[0]
@@ -354,17 +406,25 @@ class Helix(Enemy):
 class Sine(Helix):
     """Enemy that creates a wave-like pattern of movement."""
 
-    def __init__(self, direction, coordinate_bounds, grid_size):
+    __slots__ = ()
+
+    def __init__(self, direction, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
         """Initialize sine wave movement parameters."""
-        super().__init__(direction, coordinate_bounds, grid_size)
-        self.colour = "#ff005a"
+        super().__init__(direction, coordinate_bounds, grid_size, rng,
+                         row_bounds)
+        self.sprite = sprites.SINE
+
+    def reset(self, direction):
+        """Respawn the sine with its wider wave."""
+        super().reset(direction)
         self.max_offset = 2
 
     def move(self):
         """Create sine-wave movement by using fixed perpendicular offsets."""
         if self.time_to_move == self.move_gauge:
-            base_dx, base_dy = self.direction_map[self.direction]
-            perp_offsets = self.perpendicular_map[self.direction]
+            base_dx, base_dy = self.DIRECTION_MAP[self.direction]
+            perp_offsets = self.PERPENDICULAR_MAP[self.direction]
             perp_dx1, perp_dy1 = perp_offsets[0]
             perp_dx2, perp_dy2 = perp_offsets[1]
 
@@ -383,8 +443,8 @@ class Sine(Helix):
                 self.offset_direction *= -1
                 self.phase = (self.phase + 1) % 4
 
-            self.coordinates_list[0] = [round(x1), round(y1)]
-            self.coordinates_list[1] = [round(x2), round(y2)]
+            self.coordinates_list[0] = (round(x1), round(y1))
+            self.coordinates_list[1] = (round(x2), round(y2))
             self.coordinates = self.coordinates_list[0]
 
             self.move_gauge = 0
@@ -395,54 +455,75 @@ class Sine(Helix):
 class Tracker(Enemy):
     """Secret enemy that actively pursues the player."""
 
+    __slots__ = ("target_coordinates", "field", "phase", "track_delay",
+                 "max_moves", "moves_made", "life")
+
     def __init__(self, direction, coordinate_bounds, grid_size,
-                 track_delay, max_moves):
+                 track_delay, max_moves, rng=random, row_bounds=None):
         """Initialize tracker with pursuit parameters."""
+        self.track_delay = track_delay
+        self.max_moves = max_moves
+        self.field = None
         super().__init__(
-            direction, "#00ff00", coordinate_bounds, grid_size, 4
+            direction, sprites.TRACKER[0][0],
+            coordinate_bounds, grid_size, 4, rng,
+            row_bounds
         )
-        self.up_bound = self.min_coord
-        self.down_bound = self.max_coord
+
+    def reset(self, direction, track_delay=None, max_moves=None):
+        """Respawn the tracker, optionally with new pursuit parameters."""
+        # Spawns at the edge like any enemy, then roams the whole grid
+        super().reset(direction)
+        self.up_bound = self.min_row
+        self.down_bound = self.max_row
         self.left_bound = self.min_coord
         self.right_bound = self.max_coord
 
-        self.target_coordinates = [0, 0]
+        self.target_coordinates = (0, 0)
         self.phase = 0
-        self.track_delay = track_delay
-        self.max_moves = max_moves
+        if track_delay is not None:
+            self.track_delay = track_delay
+        if max_moves is not None:
+            self.max_moves = max_moves
         self.moves_made = 0
+        self.life = 0  # Row of sprites.TRACKER
 
     def set_target(self, player_coordinates):
         """Update the coordinates that the tracker is pursuing."""
         self.target_coordinates = player_coordinates
 
+    def follow(self, field):
+        """Pursue along a pathing.FlowField instead of a fixed target."""
+        self.field = field
+
     def move(self):
         """Calculate direction to target and move, updating color with age."""
         if self.time_to_move == self.move_gauge:
-            if (self.target_coordinates and
+            if ((self.field is not None or self.target_coordinates) and
                     self.phase % self.track_delay == 0):
-                # Calculate move direction
-                dx = (1 if self.target_coordinates[0] > self.coordinates[0]
-                      else -1 if self.target_coordinates[0] < self.coordinates[0]
-                      else 0)
-                dy = (1 if self.target_coordinates[1] > self.coordinates[1]
-                      else -1 if self.target_coordinates[1] < self.coordinates[1]
-                      else 0)
-
-                self.coordinates = [
+                if self.field is not None:
+                    # The field knows the way for every tracker
+                    dx, dy = self.field.step(*self.coordinates)
+                else:
+                    # Calculate move direction
+                    dx = (1 if self.target_coordinates[0] > self.coordinates[0]
+                          else -1 if self.target_coordinates[0] < self.coordinates[0]
+                          else 0)
+                    dy = (1 if self.target_coordinates[1] > self.coordinates[1]
+                          else -1 if self.target_coordinates[1] < self.coordinates[1]
+                          else 0)
+
+                self.coordinates = (
                     self.coordinates[0] + dx,
                     self.coordinates[1] + dy
-                ]
+                )
                 self.moves_made += 1
+                # Colour based on remaining lifespan
+                self.life = sprites.life_bucket(self.moves_made,
+                                                self.max_moves)
 
             self.phase += 1
             self.move_gauge = 0
-
-            # Update color based on remaining lifespan
-            life_remaining = 1 - (self.moves_made / self.max_moves)
-            red = int(255 * (1 - life_remaining))
-            green = int(255 * life_remaining)
-            self.colour = f"#{red:02x}{green:02x}00"
         else:
             self.move_gauge += 1
 
@@ -455,17 +536,43 @@ class Tracker(Enemy):
                 y >= self.down_bound or
                 self.moves_made >= self.max_moves)
 
-    def display(self, canvas):
+    def display(self, renderer):
         """Display tracker with pulsing effect."""
         x, y = self.coordinates
-        pulse = abs(math.sin(self.phase * 0.1))
-        size_mod = pulse * 0.3 * self.cell_size
-
-        canvas.create_rectangle(
-            x * self.cell_size - size_mod,
-            y * self.cell_size - size_mod,
-            (x + 1) * self.cell_size + size_mod,
-            (y + 1) * self.cell_size + size_mod,
-            fill=self.colour,
-            outline=''
-        )
+        pulse = sprites.PULSE[self.phase % sprites.PULSE_PERIOD]
+        renderer.draw_sprite(self, x, y, sprites.TRACKER[self.life][pulse])
+
+
+class EnemyPool:
+    """Free lists of culled enemies, per class, to respawn from."""
+
+    def __init__(self, coordinate_bounds, grid_size, rng=random,
+                 row_bounds=None):
+        """Initialize empty pool making enemies for a grid."""
+        self.coordinate_bounds = coordinate_bounds
+        self.row_bounds = row_bounds
+        self.grid_size = grid_size
+        self.rng = rng
+        self.free = {}  # enemy class -> list of culled enemies
+
+    def acquire(self, enemy_class, direction, **stats):
+        """Get a freshly spawned enemy, reusing a culled one if there is one."""
+        free = self.free.get(enemy_class)
+        if free:
+            enemy_instance = free.pop()
+            enemy_instance.reset(direction, **stats)
+            return enemy_instance
+        return enemy_class(direction=direction,
+                           coordinate_bounds=self.coordinate_bounds,
+                           grid_size=self.grid_size,
+                           rng=self.rng,
+                           row_bounds=self.row_bounds,
+                           **stats)
+
+    def release(self, enemy_instance):
+        """Return a culled enemy to its free list."""
+        self.free.setdefault(type(enemy_instance), []).append(enemy_instance)
+
+    def __len__(self):
+        """Get the number of enemies waiting to be reused."""
+        return sum(len(free) for free in self.free.values())
@@ -0,0 +1,463 @@
+"""Structure-of-arrays enemy store for Fire Up! game.
+
+An alternative to keeping one ``enemy.Enemy`` object per enemy, for stress
+tests with tens of thousands of enemies. Every kind of enemy keeps its
+positions, directions, move gauges and other state in parallel NumPy
+columns, and a whole kind is culled, moved, counted down and stamped into
+the occupancy grid with a handful of array operations, without any Python
+code per enemy. The stamps of every kind are gathered and applied to the
+grid together at the end of the update. Only spawning, smart trackers and
+drawing go one enemy at a time.
+
+Behaviour matches the classes in ``enemy.py`` and spawning draws from the
+RNG in the same order, so a seeded game plays out the same with either.
+Culled enemies are dropped by compacting the columns of their kind.
+
+NumPy is only needed for this backend; the game runs without it.
+"""
+try:
+    import numpy as np
+except ImportError:  # Only the arrays backend needs it
+    np = None
+
+import sprites
+
+DIRECTIONS = "UDLR"
+# Unit step for every direction, in the order of DIRECTIONS
+DIRECTION_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+# Perpendicular offsets used by Helix and Sine, in the order of DIRECTIONS
+PERPENDICULAR_STEPS = (
+    ((1, 0), (-1, 0)),
+    ((-1, 0), (1, 0)),
+    ((0, -1), (0, 1)),
+    ((0, 1), (0, -1))
+)
+# Cells of an explosion around its centre
+BLAST_STEPS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+# Kind -> (columns layout, time to move, cells per move, sprite)
+KINDS = {
+    "basic": ("straight", 3, 1, sprites.BASIC),
+    "speedy": ("straight", 1, 1, sprites.SPEEDY),
+    "leaper": ("straight", 2, 2, sprites.LEAPER),
+    "exploder": ("exploder", 3, 1, sprites.CHARGE[0]),
+    "helix": ("helix", 4, 1, sprites.HELIX),
+    "sine": ("helix", 4, 1, sprites.SINE),
+    "tracker": ("tracker", 4, 1, sprites.TRACKER[0][0])
+}
+
+# Columns of every layout, as name -> NumPy dtype; key tells enemies apart
+# for the renderer while columns are compacted
+LAYOUTS = {
+    "straight": {"key": 'i8', "x": 'i8', "y": 'i8', "direction": 'i1',
+                 "limit": 'i8', "gauge": 'i8'},
+    "exploder": {"key": 'i8', "x": 'i8', "y": 'i8', "direction": 'i1',
+                 "limit": 'i8', "gauge": 'i8', "explode_gauge": 'i8'},
+    "helix": {"key": 'i8', "x": 'i8', "y": 'i8', "x2": 'i8', "y2": 'i8',
+              "direction": 'i1', "limit": 'i8', "gauge": 'i8',
+              "offset": 'f8', "offset_direction": 'i1', "phase": 'i1'},
+    "tracker": {"key": 'i8', "x": 'i8', "y": 'i8', "gauge": 'i8',
+                "phase": 'i8', "track_delay": 'i8', "max_moves": 'i8',
+                "moves_made": 'i8'}
+}
+
+EXPLODE_TIME = sprites.EXPLODE_TIME
+
+
+class Batch:
+    """Parallel columns holding every enemy of one kind."""
+
+    def __init__(self, kind, capacity=64):
+        """Initialize empty columns for the layout of the kind."""
+        self.kind = kind
+        self.layout, self.time_to_move, self.speed, self.sprite = KINDS[kind]
+        self.columns = LAYOUTS[self.layout]
+        self.capacity = capacity
+        for name, dtype in self.columns.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        self.size = 0
+
+    def append(self, **values):
+        """Add an enemy, given a value for every column."""
+        if self.size == self.capacity:
+            # Double the columns, so spawning stays cheap on average
+            self.capacity *= 2
+            for name in self.columns:
+                column = getattr(self, name)
+                grown = np.zeros(self.capacity, column.dtype)
+                grown[:self.size] = column[:self.size]
+                setattr(self, name, grown)
+        for name in self.columns:
+            getattr(self, name)[self.size] = values[name]
+        self.size += 1
+
+    def remove(self, gone):
+        """Remove the enemies where gone is true, keeping the rest in order."""
+        keep = ~gone
+        size = int(np.count_nonzero(keep))
+        for name in self.columns:
+            column = getattr(self, name)
+            column[:size] = column[:self.size][keep]
+        self.size = size
+
+
+class EnemyStore:
+    """Every enemy of a game, kept as one batch of columns per kind."""
+
+    def __init__(self, coordinate_bounds, grid_size, occupancy, rng,
+                 row_bounds=None):
+        """
+        Initialize an empty store for a grid.
+        Bounds are the same as for enemy.Enemy.
+        """
+        if np is None:
+            raise ImportError("The arrays enemy backend needs NumPy")
+        self.min_coord, self.max_coord = coordinate_bounds
+        self.min_row, self.max_row = row_bounds or coordinate_bounds
+        self.cell_size = grid_size
+        self.occupancy = occupancy
+        # The same counts, seen as an array to stamp many cells at once
+        self.counts = np.frombuffer(occupancy.counts, dtype=np.uint16)
+        # Flat cells stamped and removed during an update
+        self.stamped = []
+        self.unstamped = []
+        self.rng = rng
+        self.batches = {kind: Batch(kind) for kind in KINDS}
+        self.next_key = 0
+
+        self.steps = np.array(DIRECTION_STEPS)
+        self.perpendicular_steps = np.array(PERPENDICULAR_STEPS)
+        self.blast_steps = np.array(BLAST_STEPS)
+        self.charge_sprites = np.array(sprites.CHARGE)
+        self.tracker_sprites = np.array(sprites.TRACKER)
+        self.pulse = np.array(sprites.PULSE)
+
+    def __len__(self):
+        """Get the number of enemies in the store."""
+        return sum(batch.size for batch in self.batches.values())
+
+    def count(self, kind):
+        """Get the number of enemies of a kind in the store."""
+        return self.batches[kind].size
+
+    def _spawn_position(self, direction):
+        """Calculate spawn position, like Enemy._get_spawn_position."""
+        if direction == "U":
+            return (self.rng.randint(self.min_coord, self.max_coord),
+                    self.max_row + 1)
+        if direction == "D":
+            return (self.rng.randint(self.min_coord, self.max_coord),
+                    self.min_row + 1)
+        if direction == "L":
+            return (self.max_coord + 1,
+                    self.rng.randint(self.min_row + 2, self.max_row))
+        return (self.min_coord - 1,
+                self.rng.randint(self.min_row + 2, self.max_row))
+
+    def _limit(self, direction, margin=0):
+        """
+        Get how far an enemy can travel before it is out of bounds.
+        Progress is measured along the direction of travel.
+        """
+        if direction == "U":
+            return -(self.min_row + 1) + margin
+        if direction == "D":
+            return self.max_row + 1 + margin
+        if direction == "L":
+            return -(self.min_coord - 1) + margin
+        return self.max_coord + 1 + margin
+
+    def spawn(self, kind, direction, track_delay=0, max_moves=0):
+        """Add a new enemy of a kind, moving in a direction."""
+        batch = self.batches[kind]
+        key = self.next_key
+        self.next_key += 1
+        x, y = self._spawn_position(direction)
+        index = DIRECTIONS.index(direction)
+        limit = self._limit(direction)
+
+        if batch.layout == "straight":
+            batch.append(key=key, x=x, y=y, direction=index, limit=limit,
+                         gauge=0)
+            self.occupancy.add(((x, y),))
+
+        elif batch.layout == "exploder":
+            batch.append(key=key, x=x, y=y, direction=index, limit=limit,
+                         gauge=0, explode_gauge=0)
+            self.occupancy.add(((x, y),))
+
+        elif batch.layout == "helix":
+            # Same draws as Helix._initialize_helix_points; the second
+            # point starts next to the edge of the grid, not the first
+            offset = self.rng.choice([-1, 1])
+            x, y = self._spawn_position(direction)
+            if direction in "UD":
+                x2, y2 = offset, y
+            else:
+                x2, y2 = x, offset
+            max_offset = 2 if kind == "sine" else 1
+            batch.append(key=key, x=x, y=y, x2=x2, y2=y2, direction=index,
+                         limit=self._limit(direction, max_offset), gauge=0,
+                         offset=0, offset_direction=1, phase=0)
+            self.occupancy.add(((x, y), (x2, y2)))
+
+        else:
+            batch.append(key=key, x=x, y=y, gauge=0, phase=0,
+                         track_delay=track_delay, max_moves=max_moves,
+                         moves_made=0)
+            self.occupancy.add(((x, y),))
+
+    def _stamp(self, xs, ys, amount):
+        """
+        Stamp cells into the occupancy grid, or remove them if amount is -1.
+        Cells outside the grid are ignored. Takes effect in _apply_stamps.
+        """
+        width, height = self.occupancy.width, self.occupancy.height
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        cells = ys[inside] * width + xs[inside]
+        (self.stamped if amount > 0 else self.unstamped).append(cells)
+
+    def _apply_stamps(self):
+        """Apply every stamp of an update to the counts, in two passes."""
+        size = len(self.counts)
+        # Only cells stamped before are removed, so counts never go below 0
+        for cells, apply in ((self.unstamped, np.subtract),
+                             (self.stamped, np.add)):
+            if cells:
+                change = np.bincount(np.concatenate(cells), minlength=size)
+                apply(self.counts, change.astype(np.uint16), out=self.counts)
+                cells.clear()
+
+    def _stamp_exploders(self, xs, ys, exploded, amount):
+        """Stamp exploders, exploded ones over the whole blast."""
+        self._stamp(xs[~exploded], ys[~exploded], amount)
+        if exploded.any():
+            blast_x = xs[exploded, None] + self.blast_steps[:, 0]
+            blast_y = ys[exploded, None] + self.blast_steps[:, 1]
+            self._stamp(blast_x.ravel(), blast_y.ravel(), amount)
+
+    def _moving(self, batch):
+        """
+        Count down the move gauges of a batch.
+        Returns the indices of the enemies that move this tick.
+        """
+        gauges = batch.gauge[:batch.size]
+        moving = np.flatnonzero(gauges == batch.time_to_move)
+        gauges += 1
+        gauges[moving] = 0
+        return moving
+
+    def update(self, pursuit):
+        """
+        Remove enemies out of bounds and move the rest, kind by kind.
+        Trackers find their way along pursuit, a pathing.FlowField.
+        """
+        for batch in self.batches.values():
+            if not batch.size:
+                continue
+            if batch.layout == "straight":
+                self._update_straight(batch)
+            elif batch.layout == "exploder":
+                self._update_exploder(batch)
+            elif batch.layout == "helix":
+                self._update_helix(batch)
+            else:
+                self._update_tracker(batch, pursuit)
+        # Nothing reads the grid until every kind has moved
+        self._apply_stamps()
+
+    def _update_straight(self, batch):
+        """Cull and move Basic, Speedy and Leaper enemies."""
+        n = batch.size
+        steps = self.steps[batch.direction[:n]]
+        xs, ys = batch.x[:n], batch.y[:n]
+        gone = steps[:, 0] * xs + steps[:, 1] * ys >= batch.limit[:n]
+        if gone.any():
+            self._stamp(xs[gone], ys[gone], -1)
+            batch.remove(gone)
+            steps = steps[~gone]
+
+        moving = self._moving(batch)
+        if not moving.size:
+            return
+        xs, ys = batch.x, batch.y
+        self._stamp(xs[moving], ys[moving], -1)
+        xs[moving] += steps[moving, 0] * batch.speed
+        ys[moving] += steps[moving, 1] * batch.speed
+        self._stamp(xs[moving], ys[moving], 1)
+
+    def _update_exploder(self, batch):
+        """Cull, move and count down Exploder enemies."""
+        n = batch.size
+        steps = self.steps[batch.direction[:n]]
+        xs, ys = batch.x[:n], batch.y[:n]
+        explode_gauges = batch.explode_gauge[:n]
+        exploded = explode_gauges >= EXPLODE_TIME
+        # The explosion lasts until the next boundary check
+        gone = ((explode_gauges > EXPLODE_TIME) |
+                (steps[:, 0] * xs + steps[:, 1] * ys >= batch.limit[:n]))
+        if gone.any():
+            self._stamp_exploders(xs[gone], ys[gone], exploded[gone], -1)
+            batch.remove(gone)
+            steps = steps[~gone]
+            exploded = exploded[~gone]
+
+        moving = self._moving(batch)
+        explode_gauges = batch.explode_gauge[:batch.size]
+        if moving.size:
+            xs, ys = batch.x, batch.y
+            self._stamp_exploders(xs[moving], ys[moving], exploded[moving],
+                                  -1)
+            xs[moving] += steps[moving, 0]
+            ys[moving] += steps[moving, 1]
+            charging = moving[explode_gauges[moving] < EXPLODE_TIME]
+            explode_gauges[charging] += 1
+            exploded = explode_gauges >= EXPLODE_TIME
+            self._stamp_exploders(xs[moving], ys[moving], exploded[moving],
+                                  1)
+        explode_gauges[exploded] += 1
+
+    def _update_helix(self, batch):
+        """Cull and move Helix or Sine enemies."""
+        n = batch.size
+        directions = batch.direction[:n]
+        steps = self.steps[directions]
+        xs, ys, x2s, y2s = batch.x[:n], batch.y[:n], batch.x2[:n], batch.y2[:n]
+        limits = batch.limit[:n]
+        gone = ((steps[:, 0] * xs + steps[:, 1] * ys >= limits) &
+                (steps[:, 0] * x2s + steps[:, 1] * y2s >= limits))
+        if gone.any():
+            self._stamp(np.concatenate((xs[gone], x2s[gone])),
+                        np.concatenate((ys[gone], y2s[gone])), -1)
+            batch.remove(gone)
+            steps = steps[~gone]
+
+        moving = self._moving(batch)
+        if not moving.size:
+            return
+        xs, ys, x2s, y2s = batch.x, batch.y, batch.x2, batch.y2
+        self._stamp(np.concatenate((xs[moving], x2s[moving])),
+                    np.concatenate((ys[moving], y2s[moving])), -1)
+
+        sine = batch.kind == "sine"
+        max_offset = 2 if sine else 1
+        offsets = batch.offset[moving]
+        perpendicular = self.perpendicular_steps[batch.direction[moving]]
+        if sine:
+            first, second = perpendicular[:, 0], perpendicular[:, 1]
+        else:
+            first = second = perpendicular[
+                np.arange(moving.size), batch.phase[moving] // 2]
+
+        # Both points move relative to the first one, rounded half to even
+        # like round()
+        base_x = xs[moving] + steps[moving, 0]
+        base_y = ys[moving] + steps[moving, 1]
+        xs[moving] = np.rint(base_x + first[:, 0] * offsets)
+        ys[moving] = np.rint(base_y + first[:, 1] * offsets)
+        x2s[moving] = np.rint(base_x + second[:, 0] * offsets)
+        y2s[moving] = np.rint(base_y + second[:, 1] * offsets)
+
+        offsets += batch.offset_direction[moving] * 0.5
+        turning = (np.abs(offsets) >= max_offset if sine
+                   else np.abs(offsets) > max_offset)
+        turned = moving[turning]
+        batch.offset_direction[turned] *= -1
+        batch.phase[turned] = (batch.phase[turned] + 1) % 4
+        batch.offset[moving] = offsets
+
+        self._stamp(np.concatenate((xs[moving], x2s[moving])),
+                    np.concatenate((ys[moving], y2s[moving])), 1)
+
+    def _update_tracker(self, batch, pursuit):
+        """Cull Tracker enemies and move the rest towards the player."""
+        n = batch.size
+        xs, ys = batch.x[:n], batch.y[:n]
+        gone = ((xs <= self.min_coord) | (xs >= self.max_coord) |
+                (ys <= self.min_row) | (ys >= self.max_row) |
+                (batch.moves_made[:n] >= batch.max_moves[:n]))
+        if gone.any():
+            self._stamp(xs[gone], ys[gone], -1)
+            batch.remove(gone)
+
+        moving = self._moving(batch)
+        if not moving.size:
+            return
+        phases = batch.phase
+        tracking = moving[phases[moving] % batch.track_delay[moving] == 0]
+        phases[moving] += 1
+        if not tracking.size:
+            return
+
+        xs, ys = batch.x, batch.y
+        self._stamp(xs[tracking], ys[tracking], -1)
+        if pursuit.occupancy is None:
+            # Nothing to avoid, every tracker heads straight for the target
+            tx, ty = pursuit.target
+            xs[tracking] += np.sign(tx - xs[tracking])
+            ys[tracking] += np.sign(ty - ys[tracking])
+        else:
+            step = pursuit.step
+            for i, x, y in zip(tracking.tolist(), xs[tracking].tolist(),
+                               ys[tracking].tolist()):
+                dx, dy = step(x, y)
+                xs[i] = x + dx
+                ys[i] = y + dy
+        batch.moves_made[tracking] += 1
+        self._stamp(xs[tracking], ys[tracking], 1)
+
+    def display(self, renderer, viewport=None):
+        """
+        Display enemies through the renderer.
+        viewport is as for Simulation.display_enemies.
+        """
+        draw_sprite = renderer.draw_sprite
+        for kind, batch in self.batches.items():
+            n = batch.size
+            if not n:
+                continue
+            xs, ys = batch.x[:n], batch.y[:n]
+            if viewport is None:
+                shown = np.arange(n)
+            else:
+                # Explosions and helix points reach up to 2 cells from x, y
+                left, top, right, bottom = viewport
+                shown = np.flatnonzero(
+                    (xs >= left - 2) & (xs < right + 2) &
+                    (ys >= top - 2) & (ys < bottom + 2))
+            keys = batch.key[shown].tolist()
+
+            if batch.layout == "straight":
+                for key, x, y in zip(keys, xs[shown].tolist(),
+                                     ys[shown].tolist()):
+                    draw_sprite((kind, key), x, y, batch.sprite)
+
+            elif batch.layout == "exploder":
+                explode_gauges = batch.explode_gauge[shown]
+                looks = np.where(
+                    explode_gauges < EXPLODE_TIME,
+                    self.charge_sprites[np.minimum(explode_gauges,
+                                                   EXPLODE_TIME - 1)],
+                    sprites.BLAST)
+                for key, x, y, sprite in zip(keys, xs[shown].tolist(),
+                                             ys[shown].tolist(),
+                                             looks.tolist()):
+                    draw_sprite((kind, key), x, y, sprite)
+
+            elif batch.layout == "helix":
+                for key, x, y, x2, y2 in zip(keys, xs[shown].tolist(),
+                                             ys[shown].tolist(),
+                                             batch.x2[shown].tolist(),
+                                             batch.y2[shown].tolist()):
+                    draw_sprite((kind, key, 0), x, y, batch.sprite)
+                    draw_sprite((kind, key, 1), x2, y2, batch.sprite)
+
+            else:
+                life = (batch.moves_made[shown] * sprites.LIFE_BUCKETS //
+                        batch.max_moves[shown])
+                pulse = self.pulse[batch.phase[shown] % sprites.PULSE_PERIOD]
+                looks = self.tracker_sprites[life, pulse]
+                for key, x, y, sprite in zip(keys, xs[shown].tolist(),
+                                             ys[shown].tolist(),
+                                             looks.tolist()):
+                    draw_sprite((kind, key), x, y, sprite)
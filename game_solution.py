@@ -16,11 +16,19 @@ The secret mode introduces its own game mode.
 
 # Imports
 from tkinter import *
-from PIL import Image, ImageTk
 import sys
 import random
 import math
-import enemy  # custom module
+from assets import AssetCache
+from controls import InputQueue
+from leaderboard import Leaderboard
+from score_history import ScoreHistory
+from renderer import RENDERERS
+from replay import Replay, ReplayArchive
+from scheduler import Scheduler
+from simulation import Simulation
+from timing import FixedTimestep
+from profiler import FrameProfiler
 import time
 import json
 
@@ -28,7 +36,8 @@ import json
 
 
 class Game:
-    def __init__(self, root):
+    def __init__(self, root, profile=False, score_history=False,
+                 arena=None, renderer="canvas"):
         """
         Fire Up!
 
@@ -38,11 +47,25 @@ class Game:
         Play this game whilst doing work!
         Play this game while revising!
         Play this game on the toilet! (Good luck with that one.)
+
+        Pass profile=True, or press F3 in game, to time every frame.
+        Pass score_history=True to record every game in an SQLite
+        database, instead of keeping only the best scores.
+        Pass arena=(columns, rows), at least as big as the window, to play
+        on a bigger arena with the view following Mr Fire.
+        Pass renderer="framebuffer" to draw each frame as one image instead
+        of a canvas item per sprite.
         """
         self.root = root
 
         # Changeable attributes
-        self.GRID_DIMENSIONS = (20, 20)  # Ideally make a square
+        self.GRID_DIMENSIONS = (20, 20)  # Cells in view
+        self.ARENA_DIMENSIONS = arena or self.GRID_DIMENSIONS
+        if (self.ARENA_DIMENSIONS[0] < self.GRID_DIMENSIONS[0] or
+                self.ARENA_DIMENSIONS[1] < self.GRID_DIMENSIONS[1]):
+            raise ValueError(
+                "The arena must be at least {}x{}, not {}x{}".format(
+                    *self.GRID_DIMENSIONS, *self.ARENA_DIMENSIONS))
         self.CELL_SIZE = 15
         self.WIDTH = self.GRID_DIMENSIONS[0] * self.CELL_SIZE
         self.HEIGHT = self.GRID_DIMENSIONS[1] * self.CELL_SIZE
@@ -52,49 +75,51 @@ class Game:
         self.root.geometry(self.GEOMETRY)
         self.root.resizable(width=False, height=False)
         self.root.title("Fire Up!")
-        self.update_id = None
+        # Every game loop, animation and clock runs through this
+        self.scheduler = Scheduler(self.root)
 
         self.MRRED = "#ff5722"
         self.MRREDACTIVE = "#ff8552"
         # Dark versions
         self.DMRRED = "#582c1c"
         self.DMRREDACTIVE = "#623b20"
+        # Logo colours, and their shades in the secret theme
+        self.SECRET_PALETTE = {
+            "#ff5722": "#39ff22",
+            "#ff8552": "#52ff54",
+            "#ff691b": "#69ff1b"
+        }
+        self.palette = None
+
+        # Where finished games are saved to be replayed, latest ones only
+        self.REPLAY_DIRECTORY = "replays"
+        self.REPLAYS_KEPT = 100
+        self.replays = ReplayArchive(self.REPLAY_DIRECTORY,
+                                     self.REPLAYS_KEPT)
 
         # Animation settings
         self.FPS = 30
         self.FRAME_TIME = int(1000 / self.FPS)
+        # The menu slows down while the window is not focused
+        self.IDLE_FRAME_TIME = 200
+        self.clock = FixedTimestep(step_time=1 / self.FPS)
 
-        # Metrics
-        self.score = 0
-
-        # Player and enemy stuffs
-        self.player_coordinates = [self.GRID_DIMENSIONS[0] // 2,
-                                   # Start in middle of grid
-                                   self.GRID_DIMENSIONS[1] // 2]
-        self.enemies = []
-        self.enemy_directions = ["U", "D", "L", "R"]
-
-        self.MIN_CHANCE = 5
-        self.basic_chance = 50
-        self.speedy_chance = 90
-        self.leaper_chance = 130
-        self.sine_chance = 170
-        self.helix_chance = 200
-        self.exploder_chance = 240
-
-        self.basic_difficulty_increase_threshold = 8
-        self.speedy_difficulty_increase_threshold = 14
-        self.leaper_difficulty_increase_threshold = 23
-        self.sine_difficulty_increase_threshold = 30
-        self.helix_difficulty_increase_threshold = 37
-        self.exploder_difficulty_increase_threshold = 50
-
-        self.basic_flag = False
-        self.speedy_flag = False
-        self.leaper_flag = False
-        self.sine_flag = False
-        self.helix_flag = False
-        self.exploder_flag = False
+        # Developer frame timings - F3 toggles, F4 dumps a trace
+        self.profiler = FrameProfiler(enabled=profile)
+        self.PROFILE_TRACE = "frame_trace.json"
+
+        # Secret
+        self.secret = False
+
+        # Best scores of both modes, saved in the background, or every
+        # game ever played
+        if score_history:
+            self.leaderboard = ScoreHistory()
+        else:
+            self.leaderboard = Leaderboard()
+
+        # Player, enemies, score and difficulty all live in the simulation
+        self.sim = self.new_simulation()
 
         # Items
         # Big Boy Canvas
@@ -107,30 +132,49 @@ class Game:
             highlightthickness=0
         )
 
-        # Grid cells and drawing
-        self.grid_cells = list()
+        # Grid and drawing
+        self.renderer = RENDERERS[renderer](
+            self.canvas, self.GRID_DIMENSIONS, self.CELL_SIZE,
+            self.ARENA_DIMENSIONS)
+
+        # Moves wait here for the next tick, at most one per tick
+        self.MOVES_PER_TICK = 1
+        self.keybinds = self.load_keybinds()
+        self.input = InputQueue(self.keybinds,
+                                moves_per_tick=self.MOVES_PER_TICK)
+        self.capturing = None  # (action, button) waiting for a new key
 
         # Le Paused and Le Boss KEy with LE GAme start
         self.is_paused = False
         self.in_game = False
+        self.is_game_over = False
         self.boss_key_active = False
 
-        # Secret
-        self.secret = False
-
         # Circles for Background
         self.MINCIRCLERADIUS = 1
         self.MAXCIRCLERADIUS = 20
+        self.CIRCLE_RADII = self.build_circle_radii()
         self.circles = list()
         self.create_circles()
         self.STOPCIRCLES = False
+        self.logo_item = None
+
+        # The menu only animates while it can be seen
+        self.window_mapped = True
+        self.window_focused = True
 
-        # Lone Image
-        img1 = Image.open(fp="logo.png")
-        self.logo = ImageTk.PhotoImage(img1)
+        # Lone Image, decoded once for the whole game
+        self.assets = AssetCache()
+        self.logo = self.assets.photo("logo.png")
 
         # Subroutine calls
         self.canvas.pack(fill=BOTH, expand=True)
+        self.root.bind('<KeyPress>', self.on_key_press)
+        self.root.bind('<KeyRelease>', self.on_key_release)
+        self.root.bind('<Map>', lambda e: self.window_shown(e, True))
+        self.root.bind('<Unmap>', lambda e: self.window_shown(e, False))
+        self.root.bind('<FocusIn>', lambda e: self.window_focus(e, True))
+        self.root.bind('<FocusOut>', lambda e: self.window_focus(e, False))
 
 # Save and load
     def load_keybinds(self):
@@ -162,23 +206,38 @@ class Game:
             return True
 
     def save_score(self, score):
-        """Save score to leaderboard file."""
-        try:
-            # Choose the correct leaderboard file based on game mode
-            filename = 'secret_leaderboard.json' if self.secret else 'leaderboard.json'
-            with open(filename, 'r') as f:
-                scores = json.load(f)
-        except FileNotFoundError:
-            scores = []
-
-        scores.append(round(score))
-        scores.sort(reverse=True)
-        scores = scores[:3]  # Keep only top 3
-
-        with open(filename, 'w') as f:
-            json.dump(scores, f)
-
-        return scores
+        """Save score to the leaderboard, returning the top 3 scores."""
+        # Choose the correct leaderboard table based on game mode
+        mode = 'secret' if self.secret else 'normal'
+        self.leaderboard.record(
+            mode,
+            round(score),
+            seed=self.sim.seed,
+            ticks=self.sim.tick,
+            peak_enemies=self.sim.peak_enemies,
+            duration=round(self.sim.tick * self.clock.step_time, 1))
+        return self.leaderboard.top_scores(mode, 3)
+
+    def save_replay(self):
+        """Save the replay of the current game, to check or re-run it later."""
+        return self.replays.save(Replay.from_simulation(self.sim))
+
+    def new_simulation(self):
+        """Make a fresh game simulation for the current mode."""
+        sim = Simulation(grid_dimensions=self.ARENA_DIMENSIONS,
+                         cell_size=self.CELL_SIZE,
+                         secret=self.secret)
+        self.profiler.instrument(
+            sim, "spawn_enemies", "update_enemies", "difficulty_change")
+        return sim
+
+    def build_circle_radii(self):
+        """Precompute the radius of a circle at every phase, in degrees."""
+        size_range = (self.MAXCIRCLERADIUS - self.MINCIRCLERADIUS) / 2
+        mid_size = (self.MAXCIRCLERADIUS + self.MINCIRCLERADIUS) / 2
+        # Whole pixels, so a circle is only redrawn when it visibly changes
+        return [round(mid_size + math.sin(math.radians(phase)) * size_range)
+                for phase in range(360)]
 
     def create_circles(self):
         """Create initial circles"""
@@ -192,8 +251,11 @@ class Game:
                     'radius': radius,
                     'fill': random.choice([self.DMRRED, self.DMRREDACTIVE]),
                     'outline': '',
-                    'phase': random.uniform(0, 180),
-                    'current_radius': radius
+                    'phase': random.randrange(0, 180),
+                    'current_radius': radius,
+                    # Canvas oval and the radius it was last drawn with
+                    'item': None,
+                    'drawn_radius': None
                 }
                 self.circles.append(circle)
 
@@ -213,76 +275,136 @@ class Game:
 
     def update_circles(self):
         """Update circle properties."""
-        if random.randint(0, 1) == 1:
-            self.create_circles()
-
+        radii = self.CIRCLE_RADII
         for circle in self.circles:
-            size_range = (self.MAXCIRCLERADIUS - self.MINCIRCLERADIUS) / 2
-            mid_size = (self.MAXCIRCLERADIUS + self.MINCIRCLERADIUS) / 2
-            circle['current_radius'] = mid_size + \
-                (math.sin(math.radians(circle['phase'])) * size_range)
+            circle['current_radius'] = radii[circle['phase']]
             circle['phase'] = (circle['phase'] + 2) % 360
 
     def draw_circles(self):
-        """Draw all circles."""
-        self.canvas.delete("all")
+        """Draw all circles, moving only those that changed size."""
+        # The items are gone whenever the canvas has been cleared
+        if not self.canvas.find_withtag('menu'):
+            for circle in self.circles:
+                circle['item'] = None
+            self.logo_item = None
 
         for circle in self.circles:
-            self.canvas.create_oval(
-                circle['x'] - circle['current_radius'],
-                circle['y'] - circle['current_radius'],
-                circle['x'] + circle['current_radius'],
-                circle['y'] + circle['current_radius'],
-                fill=circle['fill'],
-                outline=circle['outline']
-            )
+            radius = circle['current_radius']
+            if radius == circle['drawn_radius'] and circle['item']:
+                continue
+            coordinates = (circle['x'] - radius,
+                           circle['y'] - radius,
+                           circle['x'] + radius,
+                           circle['y'] + radius)
+            if circle['item'] is None:
+                circle['item'] = self.canvas.create_oval(
+                    *coordinates,
+                    fill=circle['fill'],
+                    outline=circle['outline'],
+                    tags='menu'
+                )
+            else:
+                self.canvas.coords(circle['item'], *coordinates)
+            circle['drawn_radius'] = radius
 
-        # Draw logo
-        self.canvas.create_image(
-            self.WIDTH // 2, 20, image=self.logo, anchor='n')
+        # Draw logo, once, above the circles
+        if self.logo_item is None:
+            self.logo_item = self.canvas.create_image(
+                self.WIDTH // 2, 20, image=self.logo, anchor='n',
+                tags='menu')
 
     def animate_main_menu(self):
         """Main animation loop"""
-        if not self.STOPCIRCLES:
-            self.update_circles()
-            self.draw_circles()
-            self.root.after(self.FRAME_TIME, self.animate_main_menu)
+        # Stopped while in game or hidden, see window_shown
+        if not self.STOPCIRCLES and self.window_mapped:
+            self.profiler.begin_frame()
+            self.profiler.time("update_circles", self.update_circles)
+            self.profiler.time("draw_circles", self.draw_circles)
+            self.end_profiled_frame()
+            frame_time = (self.FRAME_TIME if self.window_focused
+                          else self.IDLE_FRAME_TIME)
+            self.scheduler.schedule(
+                "menu", frame_time, self.animate_main_menu)
+
+    def start_menu_animation(self):
+        """Start animating the menu, keeping to a single animation loop."""
+        self.scheduler.cancel("menu")
+        if not self.circles:
+            self.create_circles()
+        self.animate_main_menu()
+
+    def window_shown(self, event, shown):
+        """Stop the menu animation while the window is hidden."""
+        if event.widget is not self.root:
+            return
+        self.window_mapped = shown
+        if shown and not self.scheduler.is_scheduled("menu"):
+            self.animate_main_menu()
+
+    def window_focus(self, event, focused):
+        """Slow the menu animation down while the window is not focused."""
+        if event.widget is self.root:
+            self.window_focused = focused
+
+    def on_key_press(self, event):
+        """Dispatch a key press to its action."""
+        if self.capturing is not None:
+            self.finish_capture(event)
+            return
+
+        if self.in_game and not self.is_paused:
+            action = self.input.press(event.keysym, event.time)
+        else:
+            # Moves only count while playing
+            action = self.input.action(event.keysym)
+
+        if action == 'pause':
+            if self.in_game and not self.is_game_over:
+                self.set_game_paused()
+        elif action == 'toggle_profiler':
+            self.profiler.toggle()
+        elif action == 'dump_profile':
+            self.dump_profile()
+
+    def on_key_release(self, event):
+        """Note a key release, to tell key repeats from presses."""
+        self.input.release(event.keysym, event.time)
 
     def capture_key(self, action, button):
         """Capture a new key press for the given action."""
         button.configure(text="PRESS KEY")
-
-        def on_key_press(event):
-            if event.keysym.lower() in ['escape', 'return']:
-                # Cancel key capture
-                button.configure(text=self.keybinds[action].upper())
-            else:
-                # Update keybind
-                right_key = event.keysym[0].upper() + event.keysym[1:]
-                self.keybinds[action] = (event.keysym.lower() if len(
-                    event.keysym) == 1 else right_key)
-                button.configure(text=event.keysym.upper())
-                # make noted that secret is unlocked
-                if self.save_keybinds():
-                    # Green shades
-                    self.MRRED = "#39ff22"
-                    self.MRREDACTIVE = "#52ff54"
-                    self.DMRRED = "#1d581c"
-                    self.DMRREDACTIVE = "#216220"
-                    # Reset everything to apply colours
-                    self.root.unbind('<Key>')
-                    self.root.bind('<Key>', on_key_press)
-                    self.circles = list()
-                    self.canvas.delete("all")
-                    self.root.title("Fire Up!")
-                    self.reset_keybinds()
-                    self.main_menu()
-
-            # Remove temporary binding
-            self.root.unbind('<Key>')
-
-        # Create temporary binding
-        self.root.bind('<Key>', on_key_press)
+        # The next key press goes to finish_capture
+        self.capturing = (action, button)
+
+    def finish_capture(self, event):
+        """Bind the captured key press to the action being captured."""
+        action, button = self.capturing
+        self.capturing = None
+
+        if event.keysym.lower() in ['escape', 'return']:
+            # Cancel key capture
+            button.configure(text=self.keybinds[action].upper())
+        else:
+            # Update keybind
+            right_key = event.keysym[0].upper() + event.keysym[1:]
+            self.keybinds[action] = (event.keysym.lower() if len(
+                event.keysym) == 1 else right_key)
+            button.configure(text=event.keysym.upper())
+            self.input.set_keybinds(self.keybinds)
+            # make noted that secret is unlocked
+            if self.save_keybinds():
+                # Green shades
+                self.MRRED = "#39ff22"
+                self.MRREDACTIVE = "#52ff54"
+                self.DMRRED = "#1d581c"
+                self.DMRREDACTIVE = "#216220"
+                self.palette = self.SECRET_PALETTE
+                # Reset everything to apply colours
+                self.circles = list()
+                self.canvas.delete("all")
+                self.root.title("Fire Up!")
+                self.reset_keybinds()
+                self.main_menu()
 
     def reset_keybinds(self):
         """Reset keybinds to defaults."""
@@ -292,6 +414,7 @@ class Game:
             'left': 'a',
             'right': 'd'
         }
+        self.input.set_keybinds(self.keybinds)
         self.save_keybinds()
         self.settings_menu()  # Refresh menu
 
@@ -300,179 +423,45 @@ class Game:
         if not hasattr(self, 'keybinds'):
             self.keybinds = self.load_keybinds()
 
-        # Clear existing bindings
-        for key in self.keybinds.keys():
-            self.root.unbind(key)
-
-        # Set new bindings
-        # Lambda with argument not used helps to activate function
-        self.root.bind(f'<{self.keybinds["up"]}>',
-                       lambda e: self.move_player(0, -1))
-        self.root.bind(f'<{self.keybinds["down"]}>',
-                       lambda e: self.move_player(0, 1))
-        self.root.bind(f'<{self.keybinds["left"]}>',
-                       lambda e: self.move_player(-1, 0))
-        self.root.bind(f'<{self.keybinds["right"]}>',
-                       lambda e: self.move_player(1, 0))
-        self.root.bind(f'<p>', lambda e: self.set_game_paused())
+        # Keys are dispatched by on_key_press, through this table
+        self.input.set_keybinds(self.keybinds)
+        # Nothing pressed before now carries over
+        self.input.clear()
 
     # Main menu stuffs
-    def move_player(self, dx, dy):
-        """Move the player cube in a certain direction."""
-        if not self.is_paused:
-            new_x = self.player_coordinates[0] + dx
-            new_y = self.player_coordinates[1] + dy
-
-            # Check if the new position is within bounds
-            if (0 <= new_x < self.GRID_DIMENSIONS[0] and
-                    # Start from row 2 to stay below the score area
-                    2 <= new_y < self.GRID_DIMENSIONS[1]):
-                self.player_coordinates = [new_x, new_y]
+    def move_player(self):
+        """Move the player cube by the moves queued for this tick."""
+        for dx, dy in self.input.moves():
+            self.sim.move_player(dx, dy)
 
     def draw_player(self):
-        """Draw the player cube on the canvas."""
-        x, y = self.player_coordinates
-        self.canvas.create_rectangle(
-            x * self.CELL_SIZE,
-            y * self.CELL_SIZE,
-            (x + 1) * self.CELL_SIZE,
-            (y + 1) * self.CELL_SIZE,
-            fill=self.MRRED,
-            outline=''
-        )
+        """Move the view and the player cube on the canvas."""
+        x, y = self.sim.player_coordinates
+        self.renderer.follow(x, y)
+        self.renderer.draw_player(x, y)
 
     def draw_top_visuals(self):
         """
-        Drawing the score text, and the line, for the main loop.
+        Update the score text for the main loop.
         """
-
-        # Rectangle to cover squares
-        self.canvas.create_rectangle(
-            0,
-            0,
-            self.WIDTH,
-            2 * self.CELL_SIZE - 0,
-            fill='black',
-            outline=''
-        )
-
-        # Draw the score and line
-        self.canvas.create_text(
-            self.WIDTH // 2,
-            self.CELL_SIZE,
-            text=f"Score: {round(self.score)}",
-            fill=self.MRREDACTIVE,
-            font=("Pixellari", 15)
-        )
-
-        self.canvas.create_line(
-            0,
-            2 * self.CELL_SIZE - 1,
-            self.WIDTH,
-            2 * self.CELL_SIZE - 1,
-            fill=self.MRRED
-        )
+        self.renderer.draw_score(round(self.sim.score))
 
     def draw_grid(self):
         """
-        Draw the grid for the main loop.
+        Create the grid, player, score text and line for the main loop.
+        Everything is made once per game and only updated afterwards.
         """
-        for row in range(2, self.GRID_DIMENSIONS[1]):
-            for col in range(self.GRID_DIMENSIONS[0]):
-                cell = self.canvas.create_rectangle(
-                    col * self.CELL_SIZE,
-                    row * self.CELL_SIZE,
-                    (col + 1) * self.CELL_SIZE,
-                    (row + 1) * self.CELL_SIZE,
-                    fill='black',
-                    outline='#333333'  # Subtle grid lines
-                )
-                self.grid_cells.append(cell)
+        self.renderer.build(
+            player_colour=self.MRRED,
+            text_colour=self.MRREDACTIVE,
+            line_colour=self.MRRED
+        )
 
     def draw_enemy(self):
         """
-        Draws enemies onto the grid, based on chance.
-        It also updates enemies.
+        Draws the enemies of the simulation in view onto the grid.
         """
-        coordinate_bounds = (0, self.GRID_DIMENSIONS[0])
-        grid_size = self.CELL_SIZE
-
-        # Enemy generation
-        basic_chance = random.randint(1, self.basic_chance)
-        speedy_chance = random.randint(1, self.speedy_chance)
-        leaper_chance = random.randint(1, self.leaper_chance)
-        sine_chance = random.randint(1, self.sine_chance)
-        helix_chance = random.randint(1, self.helix_chance)
-        exploder_chance = random.randint(1, self.exploder_chance)
-
-        if basic_chance == self.basic_chance:
-            direction = random.choice(self.enemy_directions)
-            basic = enemy.Basic(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(basic)
-
-        if speedy_chance == self.speedy_chance:
-            direction = random.choice(self.enemy_directions)
-            speedy = enemy.Speedy(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(speedy)
-
-        if leaper_chance == self.leaper_chance:
-            direction = random.choice(self.enemy_directions)
-            leaper = enemy.Leaper(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(leaper)
-
-        if helix_chance == self.helix_chance:
-            direction = random.choice(self.enemy_directions)
-            helix = enemy.Helix(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(helix)
-
-        if sine_chance == self.sine_chance:
-            direction = random.choice(self.enemy_directions)
-            sine = enemy.Sine(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(sine)
-
-        if exploder_chance == self.exploder_chance:
-            direction = random.choice(self.enemy_directions)
-            exploder = enemy.Exploder(
-                direction=direction, coordinate_bounds=coordinate_bounds, grid_size=grid_size)
-            self.enemies.append(exploder)
-
-        # SECRET TRACKER ENEMY only if SECRET was fondc
-        if hasattr(self, 'tracker_chance'):
-            tracker_chance = random.randint(1, self.tracker_chance)
-            tracker_stat = random.randint(2, 10)
-            if tracker_chance == self.tracker_chance:
-                direction = random.choice(self.enemy_directions)
-                tracker = enemy.Tracker(direction=direction,
-                                        coordinate_bounds=coordinate_bounds,
-                                        grid_size=grid_size,
-                                        track_delay=max(2, tracker_stat // 2),
-                                        max_moves=(tracker_stat + 4))
-                tracker.set_target(self.player_coordinates)
-                self.enemies.append(tracker)
-
-        # Area familiarisation
-        for enemy_instance in self.enemies:
-            # Check if the enemy has collided with the player
-            if enemy_instance.check_collision(self.player_coordinates):
-                self.is_game_over = True
-                self.root.after_cancel(self.update_id)
-                self.game_over()
-                return
-
-            # Check if enemy has gone off the boundaries
-            if enemy_instance.check_boundaries():
-                self.enemies.remove(enemy_instance)
-                del enemy_instance
-            else:
-                if isinstance(enemy_instance, enemy.Tracker):
-                    enemy_instance.set_target(self.player_coordinates)
-                enemy_instance.move()
-                enemy_instance.display(self.canvas)
+        self.sim.display_enemies(self.renderer, self.renderer.viewport())
 
     def update_game(self):
         """Update game state and redraw."""
@@ -480,29 +469,40 @@ class Game:
             return
 
         if not self.is_paused:
-            # Remove anything and everything
-            self.logo = None
-            self.canvas.delete("all")
+            self.profiler.begin_frame()
+
+            # Run as many fixed steps as are due, so the game speed
+            # does not depend on how long frames take
+            steps = self.clock.advance()
+            for _ in range(steps):
+                self.move_player()
+                # Spawn, move and collide enemies, and change difficulty
+                if not self.profiler.time("step", self.sim.step):
+                    self.is_game_over = True
+                    self.game_over()
+                    return
+
+            if steps == 0:
+                self.scheduler.schedule(
+                    "game", self.clock.delay_ms(), self.update_game)
+                return
 
-            # Draw the grid
-            self.draw_grid()
+            self.renderer.begin_frame()
 
             # Draw the player
-            self.draw_player()
+            self.profiler.time("draw_player", self.draw_player)
 
             # Draw enemies
-            self.draw_enemy()
+            self.profiler.time("draw_enemy", self.draw_enemy)
 
-            # Draw the score and line
-            self.draw_top_visuals()
+            # Draw the score and recycle sprites of gone enemies
+            self.profiler.time("draw_top_visuals", self.draw_top_visuals)
+            self.renderer.end_frame()
+            self.end_profiled_frame()
 
-            # Change difficulty when needed
-            self.difficulty_change()
-
-            self.score += 0.1
-
-            # Schedule the next update
-            self.update_id = self.root.after(self.FRAME_TIME, self.update_game)
+            # Schedule the next update for when the next step is due
+            self.scheduler.schedule(
+                "game", self.clock.delay_ms(), self.update_game)
 
     # Backend methods
     def exit(self):
@@ -517,6 +517,8 @@ class Game:
 
         # cant have people moving around in time
         if self.is_paused and self.in_game:
+            # Nothing runs while paused
+            self.scheduler.cancel("game")
             self.boss_k = Button(
                 self.root,
                 text='?',
@@ -535,7 +537,11 @@ class Game:
             self.boss_k.destroy()
             self.boss_k = None
             self.setup_controls()
-            self.update_game()
+            # Time spent paused is not caught up on
+            self.clock.start()
+            # Replaces the next update if it is still pending, so a quick
+            # pause and unpause cannot start a second loop
+            self.scheduler.schedule("game", 0, self.update_game)
 
     def clear_screen(self):
         """Clear all widgets except canvas."""
@@ -544,48 +550,28 @@ class Game:
                 widget.destroy()
                 widget = None
 
+    def end_profiled_frame(self):
+        """Finish profiling a frame and refresh the overlay."""
+        if self.profiler.enabled:
+            stats = self.clock.stats()
+            self.profiler.end_frame(
+                item_count=len(self.canvas.find_all()),
+                enemy_count=self.sim.enemy_count() if self.in_game else 0,
+                # Frames the clock had to catch up on, so far
+                counts={"late_frames": stats["late_frames"],
+                        "dropped_steps": stats["dropped_steps"]})
+        self.profiler.draw_overlay(self.canvas)
+
+    def dump_profile(self):
+        """Write recent frame timings to the trace file."""
+        print(f"Frame trace: {self.profiler.dump(self.PROFILE_TRACE)}")
+
     def print_info(self):
         """Print some information about the game, for developer purpose."""
         print(f"Dimensions: {self.WIDTH} x {self.HEIGHT}")
-
-    def difficulty_change(self):
-        """
-        Change difficulty relative to score.
-        """
-        score = int(self.score)
-
-        # Flags are needed so that score does not decrease drastically
-
-        if score % self.basic_difficulty_increase_threshold == 0 and not self.basic_flag:
-            self.basic_chance = max(self.MIN_CHANCE, self.basic_chance - 1)
-            self.basic_flag = True
-        elif score % self.basic_difficulty_increase_threshold != 0:
-            self.basic_flag = False
-
-        if score % self.speedy_difficulty_increase_threshold == 0 and not self.speedy_flag:
-            self.speedy_chance = max(self.MIN_CHANCE, self.speedy_chance - 1)
-            self.speedy_flag = True
-        elif score % self.speedy_difficulty_increase_threshold != 0:
-            self.speedy_flag = False
-
-        if score % self.leaper_difficulty_increase_threshold == 0 and not self.leaper_flag:
-            self.leaper_chance = max(self.MIN_CHANCE, self.leaper_chance - 1)
-            self.leaper_flag = True
-        elif score % self.leaper_difficulty_increase_threshold != 0:
-            self.leaper_flag = False
-
-        if score % self.helix_difficulty_increase_threshold == 0 and not self.helix_flag:
-            self.helix_chance = max(self.MIN_CHANCE, self.helix_chance - 1)
-            self.helix_flag = True
-        elif score % self.helix_difficulty_increase_threshold != 0:
-            self.helix_flag = False
-
-        if score % self.exploder_difficulty_increase_threshold == 0 and not self.exploder_flag:
-            self.exploder_chance = max(
-                self.MIN_CHANCE, self.exploder_chance - 1)
-            self.exploder_flag = True
-        elif score % self.exploder_difficulty_increase_threshold != 0:
-            self.exploder_flag = False
+        print(f"Timer wakeups: {self.scheduler.wakeups}")
+        for line in self.profiler.summary():
+            print(line)
 
     # Menus
     def boss_key(self):
@@ -593,6 +579,7 @@ class Game:
         Screen with time on it - make sure your professors dont know your stuff!5
         """
         if not self.boss_key_active:
+            self.scheduler.cancel_all()
             self.root.title("Clock")
             self.canvas.delete("all")
             self.clear_screen()
@@ -617,14 +604,15 @@ class Game:
                                font=('Roboto', 40),
                                command=self.main_loop)
             self.time.place(width=self.WIDTH, height=self.HEIGHT, x=0, y=0)
-            self.root.after(self.FRAME_TIME, self.boss_key)
+            # Only wakes up when the time shown changes
+            self.scheduler.schedule_on_second("clock", self.boss_key)
 
         # Emulate a clock - do not call other stuff
         # Recreating a button is inefficientS
         elif self.is_paused:
             current_time = time.strftime("%H:%M:%S")
             self.time.config(text=f"{current_time}")
-            self.update_time = self.root.after(500, self.boss_key)
+            self.scheduler.schedule_on_second("clock", self.boss_key)
 
     def game_over(self):
         """
@@ -632,11 +620,13 @@ class Game:
         """
         self.is_paused = True
 
+        self.scheduler.cancel_all()
         self.canvas.delete("all")
         self.clear_screen()
 
         # Save and get top scores
-        top_scores = self.save_score(self.score)
+        top_scores = self.save_score(self.sim.score)
+        self.save_replay()
 
         # Background
         self.canvas.create_rectangle(
@@ -661,7 +651,7 @@ class Game:
         self.canvas.create_text(
             self.WIDTH // 2,
             self.HEIGHT // 2 - 20,
-            text=f"Final Score: {round(self.score)}",
+            text=f"Final Score: {round(self.sim.score)}",
             fill=self.MRREDACTIVE,
             font=("Pixellari", 20)
         )
@@ -688,12 +678,6 @@ class Game:
 
         # Additional leaderboard display if in secret mode
         if self.secret:
-            try:
-                with open('leaderboard.json', 'r') as f:
-                    normal_scores = json.load(f)
-            except FileNotFoundError:
-                normal_scores = []
-
             for i, score in enumerate(top_scores):
                 self.canvas.create_text(
                     self.WIDTH - 70,
@@ -747,37 +731,21 @@ class Game:
         """
         Reset game state and return to main menu.
         """
-        self.score = 0
-        self.player_coordinates = [
-            self.GRID_DIMENSIONS[0] // 2, self.GRID_DIMENSIONS[1] // 2]
-        self.enemies = []
+        self.sim = self.new_simulation()
         self.is_paused = False
         self.STOPCIRCLES = False
 
-        img1 = Image.open(fp="logo.png")
-        self.logo = ImageTk.PhotoImage(img1)
-
-        self.basic_chance = 40
-        self.speedy_chance = 80
-        self.leaper_chance = 120
-        self.sine_chance = 160
-        self.helix_chance = 180
-
-        self.basic_flag = False
-        self.speedy_flag = False
-        self.leaper_flag = False
-        self.sine_flag = False
-        self.helix_flag = False
+        self.logo = self.assets.photo("logo.png", self.palette)
 
         self.clear_screen()
         self.main_menu()
 
     def main_menu(self):
         """Enter the main menu."""
+        self.scheduler.cancel_all()
         self.canvas.delete("all")
         self.clear_screen()
-        img1 = Image.open(fp="logo.png")
-        self.logo = ImageTk.PhotoImage(img1)
+        self.logo = self.assets.photo("logo.png", self.palette)
 
         self.in_game = False
 
@@ -795,13 +763,14 @@ class Game:
                    2 - 30, y=self.HEIGHT//2 + 80)
 
         # Start animation
-        self.animate_main_menu()
+        self.start_menu_animation()
 
     def settings_menu(self):
         """
         Creates a settings menu, where keybinds are stored and saved for later use.
         """
         self.logo = None
+        self.scheduler.cancel_all()
         self.canvas.delete("all")
         self.clear_screen()
 
@@ -928,11 +897,17 @@ class Game:
             y=self.HEIGHT - 50
         )
 
+        # The menu background keeps moving behind the settings
+        self.start_menu_animation()
+
     def main_loop(self):
         """Main game loop."""
         # Clear screen
         # Some things are for the boss key
         self.circles = list()
+        self.logo = None
+        # Stops the menu, and the boss key clock if we came from it
+        self.scheduler.cancel_all()
         self.canvas.delete("all")
         self.STOPCIRCLES = True
         self.root.title("Fire Up!")
@@ -942,41 +917,15 @@ class Game:
 
         # Reset - for every new game - only if boss key isn't active
         if not self.boss_key_active:
-            self.score = 0
-            self.player_coordinates = [
-                self.GRID_DIMENSIONS[0] // 2, self.GRID_DIMENSIONS[1] // 2]
-            self.enemies = []
+            self.sim = self.new_simulation()
             self.is_paused = False
-            self.basic_chance = 40
-            self.speedy_chance = 80
-            self.leaper_chance = 120
-            self.sine_chance = 160
-            self.helix_chance = 180
-
-            self.basic_flag = False
-            self.speedy_flag = False
-            self.leaper_flag = False
-            self.sine_flag = False
-            self.helix_flag = False
-
-        # Boss key should not pop up after we go off it
-        if hasattr(self, 'update_time'):
-            self.root.after_cancel(self.update_time)
-
-        # if secret is found, make spawn chances different
-        if self.secret:
-            self.basic_chance = 10000
-            self.speedy_chance = 11500
-            self.leaper_chance = 13000
-            self.sine_chance = 17000
-            self.helix_chance = 20000
-            self.exploder_chance = 15
-            self.tracker_chance = 15
-            self.exploder_difficulty_increase_threshold = 10  # go crazy
 
         self.boss_key_active = False
         self.in_game = True
 
+        # Canvas items for the game are made once here
+        self.draw_grid()
+
         # Setup controls
         self.setup_controls()
 
@@ -996,12 +945,33 @@ class Game:
         pause.place(width=30, height=20, x=self.WIDTH - 35, y=5)
 
         # Start game updates
+        self.clock.start()
         self.update_game()
 
 
 # is this the main file?
 if __name__ == "__main__":
     root = Tk()
-    game = Game(root)
+    arena = None
+    if "--arena" in sys.argv:
+        # e.g. --arena 500x500
+        try:
+            columns, rows = sys.argv[sys.argv.index("--arena") + 1].split("x")
+            arena = (int(columns), int(rows))
+        except (IndexError, ValueError):
+            sys.exit("--arena takes COLUMNSxROWS, e.g. --arena 500x500")
+    renderer = "canvas"
+    if "--renderer" in sys.argv:
+        # canvas or framebuffer
+        renderer = sys.argv[sys.argv.index("--renderer") + 1]
+    try:
+        game = Game(root,
+                    profile="--profile" in sys.argv,
+                    score_history="--score-history" in sys.argv,
+                    arena=arena,
+                    renderer=renderer)
+    except ValueError as error:
+        # e.g. an arena smaller than the window
+        sys.exit(str(error))
     game.main_menu()
     root.mainloop()
@@ -0,0 +1,210 @@
+"""Leaderboard storage for Fire Up! game.
+
+Every game mode has its own table, kept as two files:
+
+- a snapshot, e.g. ``leaderboard.json``, holding the best entries as of the
+  last compaction
+- an append-only log next to it, e.g. ``leaderboard.log``, with one JSON
+  entry per line for every score recorded since
+
+A table is loaded by reading the snapshot and replaying the log on top of
+it into a heap of the best ``keep`` entries. Every entry has a sequence
+number, and the snapshot records the last one it includes, so entries left
+in the log by a crash during compaction are not counted twice. A torn last
+line, from a crash mid-write, is cut off the log when it is loaded, and
+any other line that cannot be read is skipped.
+
+Compaction writes the snapshot to a temporary file and renames it over the
+old one, so the snapshot is always whole. Snapshots from before this
+module, plain lists of scores, are still read.
+
+The heap is updated as soon as a score is recorded, so the game can show it
+straight away, while appending and compacting happens on a background
+writer thread.
+"""
+import atexit
+import heapq
+import json
+import os
+import queue
+import threading
+import time
+
+VERSION = 1
+
+# Mode -> snapshot file of its table
+DEFAULT_TABLES = {
+    "normal": "leaderboard.json",
+    "secret": "secret_leaderboard.json"
+}
+
+
+class Table:
+    """The best entries of one game mode."""
+
+    def __init__(self, filename, keep):
+        """Initialize table from its snapshot and log files."""
+        self.filename = filename
+        self.log_filename = os.path.splitext(filename)[0] + ".log"
+        self.keep = keep
+        self.heap = []  # (score, -seq, entry), worst entry first
+        self.last_seq = 0
+        self.compacted_through = 0
+        self.appended = 0  # entries in the log since the last compaction
+        self.load()
+
+    def load(self):
+        """Read the snapshot and replay the log."""
+        try:
+            with open(self.filename, 'r') as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, ValueError):
+            snapshot = []
+
+        if isinstance(snapshot, list):
+            # Old leaderboard, only scores
+            entries = [{"seq": seq, "score": score}
+                       for seq, score in enumerate(snapshot, 1)]
+            self.compacted_through = len(entries)
+        else:
+            entries = snapshot["entries"]
+            self.compacted_through = snapshot["compacted_through"]
+        self.last_seq = self.compacted_through
+        for entry in entries:
+            self.push(entry)
+
+        try:
+            with open(self.log_filename, 'rb+') as f:
+                offset = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Torn write; cut it off so the next append starts
+                        # on a line of its own
+                        f.truncate(offset)
+                        break
+                    offset += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Damaged line, the rest are still good
+                    if entry["seq"] > self.compacted_through:
+                        self.push(entry)
+                        self.appended += 1
+        except FileNotFoundError:
+            pass
+
+    def push(self, entry):
+        """Add an entry, keeping only the best ones."""
+        self.last_seq = max(self.last_seq, entry["seq"])
+        item = (entry["score"], -entry["seq"], entry)
+        if len(self.heap) < self.keep:
+            heapq.heappush(self.heap, item)
+        else:
+            # Ties go to the entry recorded first
+            heapq.heappushpop(self.heap, item)
+
+    def top(self, count):
+        """Get the best count entries, best first."""
+        return [entry for _, _, entry in heapq.nlargest(count, self.heap)]
+
+    def snapshot(self):
+        """Get the snapshot of the table as it is now."""
+        return {
+            "version": VERSION,
+            "compacted_through": self.last_seq,
+            "entries": self.top(self.keep)
+        }
+
+    def append(self, entry):
+        """Append an entry to the log."""
+        with open(self.log_filename, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self, snapshot):
+        """Replace the snapshot and empty the log."""
+        temporary = self.filename + ".tmp"
+        with open(temporary, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.filename)
+        # Entries left here by a crash are skipped by the snapshot's seq
+        open(self.log_filename, 'w').close()
+
+
+class Leaderboard:
+    """Tables of the best scores of every mode, written in the background."""
+
+    def __init__(self, tables=None, keep=10, compact_every=20):
+        """Initialize leaderboard, keeping the best keep entries per mode."""
+        self.tables = {mode: Table(filename, keep)
+                       for mode, filename in (tables or DEFAULT_TABLES).items()}
+        self.compact_every = compact_every
+        self.error = None  # Last error of the writer, if any
+
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def record(self, mode, score, **metadata):
+        """
+        Record the score of a finished game, e.g. with its seed and ticks.
+        Returns the entry.
+        """
+        table = self.tables[mode]
+        entry = {"seq": table.last_seq + 1, "score": score,
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **metadata}
+        table.push(entry)
+        self.writes.put((table.append, entry))
+
+        table.appended += 1
+        if table.appended >= self.compact_every:
+            self.compact(mode)
+        return entry
+
+    def compact(self, mode):
+        """Compact the log of a mode into its snapshot, in the background."""
+        table = self.tables[mode]
+        table.appended = 0
+        self.writes.put((table.compact, table.snapshot()))
+
+    def top(self, mode, count=3):
+        """Get the best count entries of a mode, best first."""
+        return self.tables[mode].top(count)
+
+    def top_scores(self, mode, count=3):
+        """Get the best count scores of a mode, best first."""
+        return [entry["score"] for entry in self.top(mode, count)]
+
+    def _write(self):
+        """Carry out queued writes until closed."""
+        while True:
+            write = self.writes.get()
+            try:
+                if write is None:
+                    return
+                function, argument = write
+                try:
+                    function(argument)
+                except OSError as error:
+                    # Kept in memory; game over must not fail on disk errors
+                    self.error = error
+            finally:
+                self.writes.task_done()
+
+    def flush(self):
+        """Wait until everything recorded so far is on disk."""
+        self.writes.join()
+
+    def close(self):
+        """Compact every table and stop the writer."""
+        if not self.writer.is_alive():
+            return
+        for mode, table in self.tables.items():
+            if table.appended:
+                self.compact(mode)
+        self.writes.put(None)
+        self.writer.join()
@@ -0,0 +1,37 @@
+"""Occupancy grid for Fire Up! game.
+
+Every enemy stamps the cells it would hit the player on into a flat array
+the size of the grid, so checking the player for a collision is a single
+lookup however many enemies there are. Each cell holds a count, since
+enemies can overlap.
+"""
+from array import array
+
+
+class OccupancyGrid:
+    """Number of enemies covering each cell of the grid."""
+
+    def __init__(self, grid_dimensions):
+        """Initialize an empty grid of the given dimensions."""
+        self.width, self.height = grid_dimensions
+        self.counts = array('H', bytes(2 * self.width * self.height))
+
+    def add(self, cells):
+        """Stamp cells; cells outside the grid are ignored."""
+        width, height, counts = self.width, self.height, self.counts
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                counts[y * width + x] += 1
+
+    def remove(self, cells):
+        """Remove cells stamped by add."""
+        width, height, counts = self.width, self.height, self.counts
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                counts[y * width + x] -= 1
+
+    def occupied(self, x, y):
+        """Check if any enemy covers the given cell."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.counts[y * self.width + x] > 0
+        return False
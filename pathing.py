@@ -0,0 +1,161 @@
+"""Shared pursuit flow field for Fire Up! game.
+
+Rather than every Tracker working out its own way to the player, one
+breadth-first search from the player's cell gives the distance of every
+cell of the grid to the player, in moves of one cell in any of the eight
+directions. A tracker then steps to whichever neighbouring cell is closest,
+one lookup per neighbour however many trackers there are.
+
+Given an occupancy grid, cells with enemies on them cannot be walked
+through, so trackers route around other enemies. The field is then
+searched on every tick that has trackers (a Simulation does not update it
+otherwise), before any enemy moves, so every tracker sees the
+enemies where they were at the start of the tick, whatever order the
+enemies are updated in. A tracker's own cell is blocked by its own stamp,
+so it goes by the distance of its neighbours.
+
+Among equally good steps the direct one, straight or diagonally towards
+the player, is taken, so without hazards trackers move exactly as if they
+headed straight for the player (``python pathing.py`` checks this).
+Without an occupancy grid nothing is in the way, so that step is taken
+without searching at all.
+
+On large arenas the search can be limited to cells within a radius of the
+player; trackers further out head straight for the player until they are
+close enough for routing around enemies to matter.
+"""
+from array import array
+
+# Eight neighbours of a cell
+NEIGHBOUR_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0),
+                   (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+
+class FlowField:
+    """Distance of every cell to a target."""
+
+    def __init__(self, grid_dimensions, occupancy=None, radius=None):
+        """
+        Initialize field for a grid.
+        Cells covered in occupancy, if given, are avoided.
+        radius, if given, limits searches to that many moves of the target.
+        """
+        self.width, self.height = grid_dimensions
+        self.occupancy = occupancy
+        self.radius = radius
+        cells = self.width * self.height
+        self.unreached = array('l', [-1]) * cells
+        self.distances = array('l', self.unreached)
+
+        self.target = None
+        self.searches = 0  # For profiling
+
+    def update(self, target):
+        """Aim the field at target, searching again if it avoids enemies."""
+        self.target = target
+        # Called before any enemy moves, so every tracker routes around
+        # enemies where they were at the start of the tick
+        if self.occupancy is not None:
+            self.search()
+
+    def search(self):
+        """Work out the distance of every reachable cell to the target."""
+        self.searches += 1
+        distances = self.distances
+        distances[:] = self.unreached
+
+        tx, ty = self.target
+        width, height = self.width, self.height
+        if not (0 <= tx < width and 0 <= ty < height):
+            return
+        blocked = (self.occupancy.counts if self.occupancy is not None
+                   else None)
+        radius = self.radius if self.radius is not None else len(distances)
+
+        start = ty * width + tx
+        distances[start] = 0
+        frontier = [start]
+        distance = 0
+        while frontier and distance < radius:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                y, x = divmod(cell, width)
+                for dx, dy in NEIGHBOUR_STEPS:
+                    if not (0 <= x + dx < width and 0 <= y + dy < height):
+                        continue
+                    neighbour = cell + dy * width + dx
+                    if distances[neighbour] < 0 and not (
+                            blocked and blocked[neighbour]):
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+    def step(self, x, y):
+        """Get the (dx, dy) that takes a tracker at x, y to the target."""
+        tx, ty = self.target
+        direct = ((tx > x) - (tx < x), (ty > y) - (ty < y))
+        width, height = self.width, self.height
+        if self.occupancy is None or not (0 <= x < width and 0 <= y < height):
+            return direct
+
+        distances = self.distances
+        cell = y * width + x
+        if distances[cell] == 0:
+            return (0, 0)  # Already at the target
+
+        # A tracker stands on a cell stamped as blocked, which is never
+        # reached, so it goes by its closest neighbour
+        best, best_step = len(distances), None
+        for dx, dy in NEIGHBOUR_STEPS:
+            if 0 <= x + dx < width and 0 <= y + dy < height:
+                distance = distances[cell + dy * width + dx]
+                if 0 <= distance < best:
+                    best, best_step = distance, (dx, dy)
+        if best_step is None:
+            # Walled in, or out of the search radius
+            return direct
+
+        # The direct step, when it is as good as any
+        dx, dy = direct
+        if (0 <= x + dx < width and 0 <= y + dy < height and
+                distances[cell + dy * width + dx] == best):
+            return direct
+        return best_step
+
+
+def main():
+    """Check that trackers with no hazards head straight for the player."""
+    import argparse
+    from occupancy import OccupancyGrid
+
+    parser = argparse.ArgumentParser(description="Fire Up! pursuit check")
+    parser.add_argument("--size", type=int, default=10,
+                        help="check every position on a size x size grid")
+    args = parser.parse_args()
+
+    grid_dimensions = (args.size, args.size)
+    cells = [(x, y) for y in range(args.size) for x in range(args.size)]
+    plain = FlowField(grid_dimensions)
+    occupancy = OccupancyGrid(grid_dimensions)
+    smart = FlowField(grid_dimensions, occupancy)
+
+    checked = differ = 0
+    for target in cells:
+        plain.update(target)
+        for tracker in cells:
+            if tracker == target:
+                continue
+            # The tracker alone, stamped like every enemy
+            occupancy.add((tracker,))
+            smart.update(target)
+            occupancy.remove((tracker,))
+            checked += 1
+            differ += smart.step(*tracker) != plain.step(*tracker)
+    print(f"{differ} of {checked} steps differ")
+    if differ:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
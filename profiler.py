@@ -0,0 +1,161 @@
+"""Frame profiler for Fire Up! game.
+
+Opt-in timings of every phase of a frame, kept over a rolling window of
+recent frames, along with the number of canvas items and enemies and any
+running counts the game reports, such as late frames and dropped steps.
+Shows p50/p95/p99 timings and the latest counts in an overlay on the
+canvas, and can dump the recent frames to a JSON or CSV trace file.
+
+Nothing is timed while the profiler is disabled, apart from a flag check.
+"""
+import csv
+import json
+import time
+from collections import deque
+
+
+class FrameProfiler:
+    """Rolling per-phase timings of recent frames."""
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=300, enabled=False, clock=time.perf_counter):
+        """Initialize profiler keeping the last window frames."""
+        self.window = window
+        self.enabled = enabled
+        self.clock = clock
+
+        self.timings = {}  # phase -> deque of seconds
+        self.frames = deque(maxlen=window)  # per-frame rows for traces
+        self.counts = {}  # running counts as of the last frame
+        self.current = None
+        self.frame_start = None
+
+        self.overlay = None
+        self.overlay_every = 15  # frames between overlay refreshes
+        self.frames_since_overlay = 0
+
+    def toggle(self):
+        """Turn profiling and its overlay on or off."""
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def begin_frame(self):
+        """Start timing a frame."""
+        if self.enabled:
+            self.current = {}
+            self.frame_start = self.clock()
+
+    def end_frame(self, item_count=None, enemy_count=None, counts=None):
+        """
+        Finish timing a frame, recording the live item and enemy counts.
+        counts, e.g. {"late_frames": 3}, are recorded with the frame too.
+        """
+        if not self.enabled or self.current is None:
+            return
+        self.record("frame", self.clock() - self.frame_start)
+        row = {name: round(seconds * 1000, 4)
+               for name, seconds in self.current.items()}
+        row["items"] = item_count
+        row["enemies"] = enemy_count
+        self.counts = dict(counts or {})
+        row.update(self.counts)
+        self.frames.append(row)
+        self.current = None
+
+    def record(self, phase, seconds):
+        """Record how long a phase took."""
+        if phase not in self.timings:
+            self.timings[phase] = deque(maxlen=self.window)
+        self.timings[phase].append(seconds)
+        if self.current is not None:
+            self.current[phase] = self.current.get(phase, 0) + seconds
+
+    def time(self, phase, function, *args):
+        """Call function, timing it as phase when profiling."""
+        if not self.enabled:
+            return function(*args)
+        start = self.clock()
+        result = function(*args)
+        self.record(phase, self.clock() - start)
+        return result
+
+    def instrument(self, obj, *method_names):
+        """Time the given methods of an object, under their own names."""
+        for name in method_names:
+            method = getattr(obj, name)
+
+            def timed(*args, _method=method, _name=name):
+                return self.time(_name, _method, *args)
+            setattr(obj, name, timed)
+
+    def percentiles(self, phase):
+        """Get the p50, p95 and p99 of a phase in milliseconds."""
+        samples = sorted(self.timings.get(phase, ()))
+        if not samples:
+            return tuple(0.0 for _ in self.PERCENTILES)
+        last = len(samples) - 1
+        return tuple(samples[round(last * p / 100)] * 1000
+                     for p in self.PERCENTILES)
+
+    def summary(self):
+        """Get one line per phase with its percentiles."""
+        lines = []
+        for phase in self.timings:
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f"{phase}: {p50:.2f}/{p95:.2f}/{p99:.2f} ms")
+        if self.frames:
+            last = self.frames[-1]
+            lines.append(f"items: {last['items']}  "
+                         f"enemies: {last['enemies']}")
+        if self.counts:
+            lines.append("  ".join(f"{name.replace('_', ' ')}: {count}"
+                                   for name, count in self.counts.items()))
+        return lines
+
+    def draw_overlay(self, canvas):
+        """Show the summary on the canvas, refreshing every few frames."""
+        if not self.enabled:
+            self.hide_overlay(canvas)
+            return
+        self.frames_since_overlay += 1
+        if self.frames_since_overlay < self.overlay_every:
+            return
+        self.frames_since_overlay = 0
+
+        text = "p50/p95/p99\n" + "\n".join(self.summary())
+        # The item is gone whenever the canvas has been cleared
+        if not canvas.find_withtag('profiler'):
+            self.overlay = canvas.create_text(
+                4, 34, text=text, anchor='nw', fill='#00ff00',
+                font=("Courier", 8), tags='profiler')
+        else:
+            canvas.itemconfigure(self.overlay, text=text)
+        canvas.tag_raise('profiler')
+
+    def hide_overlay(self, canvas):
+        """Remove the overlay from the canvas."""
+        if self.overlay is not None:
+            canvas.delete('profiler')
+            self.overlay = None
+
+    def dump(self, filename):
+        """Write the recent frames to a .json or .csv trace file."""
+        rows = list(self.frames)
+        if filename.endswith(".csv"):
+            columns = []
+            for row in rows:
+                columns.extend(name for name in row if name not in columns)
+            with open(filename, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(filename, 'w') as f:
+                json.dump({
+                    "percentiles_ms": {phase: self.percentiles(phase)
+                                       for phase in self.timings},
+                    "counts": self.counts,
+                    "frames": rows
+                }, f, indent=1)
+        return filename
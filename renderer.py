@@ -0,0 +1,291 @@
+"""Game renderers for Fire Up! game.
+
+Two renderers draw the game onto its canvas through the same methods, and
+the game picks one at startup (see ``RENDERERS``):
+
+- ``CanvasRenderer`` keeps a canvas image item per sprite. Items are
+  created once and are afterwards only moved with ``coords`` or given
+  another sprite with ``itemconfigure``. Enemy sprites come from a pool:
+  an enemy keeps the same item while it lives, and the item is hidden and
+  recycled for the next enemy once it leaves the board.
+- ``FramebufferRenderer`` fills every sprite into a PIL image and pushes
+  the whole frame to one canvas image with a single ``paste``, so a frame
+  costs the same number of Tk calls however many enemies there are. The
+  image is also there to record frames from.
+
+The grid is baked into a single background image, rendered once per grid
+and cell size. The score area is made of canvas items with either
+renderer.
+
+The arena can be larger than the canvas, in which case a camera follows
+the player, a whole cell at a time so the grid image never has to move.
+Enemies are placed by cell and shifted into view here; sprites
+wholly outside the view are not drawn at all, so the number of canvas
+items depends on the size of the view, not of the arena.
+"""
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageTk
+
+from sprites import sprite_atlas
+
+
+@lru_cache(maxsize=None)
+def grid_image(grid_dimensions, cell_size):
+    """Render the playing grid into an image, below the score area."""
+    columns, rows = grid_dimensions
+    image = Image.new("RGB", (columns * cell_size, rows * cell_size),
+                      "black")
+    draw = ImageDraw.Draw(image)
+    for row in range(2, rows):
+        for col in range(columns):
+            draw.rectangle(
+                (col * cell_size,
+                 row * cell_size,
+                 (col + 1) * cell_size,
+                 (row + 1) * cell_size),
+                outline='#333333'  # Subtle grid lines
+            )
+    return image
+
+
+class Renderer:
+    """Camera and score area shared by every renderer."""
+
+    def __init__(self, canvas, grid_dimensions, cell_size,
+                 world_dimensions=None):
+        """
+        Initialize renderer for a canvas of the given grid size.
+        world_dimensions is the size of the arena, if larger than the view.
+        """
+        self.canvas = canvas
+        self.grid_dimensions = grid_dimensions
+        self.world_dimensions = world_dimensions or grid_dimensions
+        self.cell_size = cell_size
+
+        self.view_width = grid_dimensions[0] * cell_size
+        self.view_height = grid_dimensions[1] * cell_size
+        # Top left cell in view, and where that is in arena pixels
+        self.camera = (0, 0)
+        self.offset_x = self.offset_y = 0
+
+        self.score_text = None
+        self.score_value = None
+        self.frame = 0
+
+        # Every look of every enemy, drawn once
+        self.atlas = sprite_atlas(cell_size)
+
+    def build_hud(self, text_colour, line_colour):
+        """Create the score area, above everything else."""
+        width = self.view_width
+        self.score_value = None
+
+        # Rectangle to cover squares, the score and the line
+        self.canvas.create_rectangle(
+            0, 0, width, 2 * self.cell_size,
+            fill='black', outline='', tags='hud')
+        self.score_text = self.canvas.create_text(
+            width // 2, self.cell_size,
+            text='', fill=text_colour,
+            font=("Pixellari", 15), tags='hud')
+        self.canvas.create_line(
+            0, 2 * self.cell_size - 1, width, 2 * self.cell_size - 1,
+            fill=line_colour, tags='hud')
+
+    def follow(self, x, y):
+        """Centre the view on a cell, without looking past the arena."""
+        columns, rows = self.grid_dimensions
+        world_columns, world_rows = self.world_dimensions
+        left = min(max(x - columns // 2, 0), max(world_columns - columns, 0))
+        top = min(max(y - rows // 2, 0), max(world_rows - rows, 0))
+        self.camera = (left, top)
+        self.offset_x = left * self.cell_size
+        self.offset_y = top * self.cell_size
+
+    def viewport(self):
+        """Get the (left, top, right, bottom) cells in view."""
+        left, top = self.camera
+        columns, rows = self.grid_dimensions
+        return (left, top, left + columns, top + rows)
+
+    def begin_frame(self):
+        """Start a new frame of sprite drawing."""
+        self.frame += 1
+
+    def draw_score(self, score):
+        """Update the score text, if the shown value has changed."""
+        if score != self.score_value:
+            self.canvas.itemconfigure(self.score_text, text=f"Score: {score}")
+            self.score_value = score
+
+
+class CanvasRenderer(Renderer):
+    """Keeps the game canvas items alive between frames."""
+
+    def __init__(self, canvas, grid_dimensions, cell_size,
+                 world_dimensions=None):
+        """Initialize renderer with no items yet."""
+        super().__init__(canvas, grid_dimensions, cell_size,
+                         world_dimensions)
+        self.grid_photo = None
+        self.sprite_photos = None
+        self.player = None
+        self.player_coords = None
+
+        # key -> [item, coords, sprite, frame drawn]
+        self.sprites = {}
+        self.free_items = []
+
+    def build(self, player_colour, text_colour, line_colour):
+        """Create the static items for a new game on a cleared canvas."""
+        self.sprites = {}
+        self.free_items = []
+        self.player_coords = None
+        self.follow(0, 0)
+        if self.sprite_photos is None:
+            # Needs a Tk root; Tk only keeps the images while we hold them
+            self.sprite_photos = [ImageTk.PhotoImage(image)
+                                  for image in self.atlas.images]
+
+        self.draw_grid()
+
+        self.player = self.canvas.create_rectangle(
+            0, 0, 0, 0, fill=player_colour, outline='')
+
+        self.build_hud(text_colour, line_colour)
+
+    def draw_grid(self):
+        """Show the grid as one image item, below everything else."""
+        if self.grid_photo is None:
+            # Tk only keeps the image while we hold a reference to it
+            self.grid_photo = ImageTk.PhotoImage(
+                grid_image(self.grid_dimensions, self.cell_size))
+        self.canvas.create_image(0, 0, image=self.grid_photo, anchor='nw')
+
+    def end_frame(self):
+        """Hide and recycle every sprite not drawn during this frame."""
+        stale = [key for key, sprite in self.sprites.items()
+                 if sprite[3] != self.frame]
+        for key in stale:
+            item = self.sprites.pop(key)[0]
+            self.canvas.itemconfigure(item, state='hidden')
+            self.free_items.append(item)
+
+    def draw_player(self, x, y):
+        """Move the player cube, if it has moved."""
+        x, y = x - self.camera[0], y - self.camera[1]
+        coords = (x * self.cell_size, y * self.cell_size,
+                  (x + 1) * self.cell_size, (y + 1) * self.cell_size)
+        if coords != self.player_coords:
+            self.canvas.coords(self.player, *coords)
+            self.player_coords = coords
+
+    def draw_sprite(self, key, x, y, sprite):
+        """Show a sprite identified by key on the cell at x, y."""
+        atlas = self.atlas
+        dx, dy = atlas.offsets[sprite]
+        x0 = x * self.cell_size + dx - self.offset_x
+        y0 = y * self.cell_size + dy - self.offset_y
+        width, height = atlas.sizes[sprite]
+        if (x0 + width <= 0 or y0 + height <= 0 or
+                x0 >= self.view_width or y0 >= self.view_height):
+            # Out of view, hidden or recycled at the end of the frame
+            return
+        coords = (x0, y0)
+        entry = self.sprites.get(key)
+
+        if entry is None:
+            photo = self.sprite_photos[sprite]
+            if self.free_items:
+                item = self.free_items.pop()
+                self.canvas.coords(item, *coords)
+                self.canvas.itemconfigure(item, image=photo, state='normal')
+            else:
+                item = self.canvas.create_image(
+                    *coords, image=photo, anchor='nw')
+                # Keep sprites underneath the score area
+                self.canvas.tag_lower(item, 'hud')
+            self.sprites[key] = [item, coords, sprite, self.frame]
+            return
+
+        if entry[1] != coords:
+            self.canvas.coords(entry[0], *coords)
+            entry[1] = coords
+        if entry[2] != sprite:
+            self.canvas.itemconfigure(entry[0],
+                                      image=self.sprite_photos[sprite])
+            entry[2] = sprite
+        entry[3] = self.frame
+
+
+class FramebufferRenderer(Renderer):
+    """Draws every frame into one image, shown with one Tk call."""
+
+    def __init__(self, canvas, grid_dimensions, cell_size,
+                 world_dimensions=None):
+        """Initialize renderer with a blank frame."""
+        super().__init__(canvas, grid_dimensions, cell_size,
+                         world_dimensions)
+        self.background = grid_image(grid_dimensions, cell_size)
+        self.image = Image.new("RGB", self.background.size, "black")
+        self.draw = ImageDraw.Draw(self.image)
+        self.photo = None
+        self.player_colour = None
+
+    def build(self, player_colour, text_colour, line_colour):
+        """Create the frame and score items for a new game."""
+        self.player_colour = player_colour
+        self.follow(0, 0)
+        self.draw_grid()
+        self.build_hud(text_colour, line_colour)
+
+    def draw_grid(self):
+        """Show the frame as one image item, below everything else."""
+        self.image.paste(self.background)
+        if self.photo is None:
+            # Tk only keeps the image while we hold a reference to it
+            self.photo = ImageTk.PhotoImage(self.image)
+        else:
+            self.photo.paste(self.image)
+        self.canvas.create_image(0, 0, image=self.photo, anchor='nw')
+
+    def begin_frame(self):
+        """Start a new frame on a clean grid."""
+        super().begin_frame()
+        self.image.paste(self.background)
+
+    def end_frame(self):
+        """Show the frame on the canvas."""
+        self.photo.paste(self.image)
+
+    def draw_player(self, x, y):
+        """Fill the player cube in."""
+        x, y = x - self.camera[0], y - self.camera[1]
+        size = self.cell_size
+        self.draw.rectangle((x * size, y * size,
+                             (x + 1) * size - 1, (y + 1) * size - 1),
+                            fill=self.player_colour)
+
+    def draw_sprite(self, key, x, y, sprite):
+        """Fill a sprite in on the cell at x, y, over anything before it."""
+        atlas = self.atlas
+        dx, dy = atlas.offsets[sprite]
+        width, height = atlas.sizes[sprite]
+        x0 = x * self.cell_size + dx - self.offset_x
+        y0 = y * self.cell_size + dy - self.offset_y
+        # Sprites are solid, and filling one in is quicker than pasting it;
+        # parts outside the frame are clipped by PIL
+        self.draw.rectangle((x0, y0, x0 + width - 1, y0 + height - 1),
+                            fill=atlas.colours[sprite])
+
+    def snapshot(self):
+        """Get a copy of the last frame, e.g. to record the game."""
+        return self.image.copy()
+
+
+# Renderers the game can be started with
+RENDERERS = {
+    "canvas": CanvasRenderer,
+    "framebuffer": FramebufferRenderer
+}
@@ -0,0 +1,247 @@
+"""Replay recording and playback for Fire Up! game.
+
+A replay is the seed of a game plus every move the player made, stored
+against the tick it was made on. Since all randomness of a ``Simulation``
+comes from its seed, this is enough to re-run the game exactly, headless and
+as fast as the machine allows.
+
+Moves are stored compactly as one string of ``<ticks since last move><dir>``
+tokens, e.g. ``"12U 0L 3D"``.
+
+A replay also records the digest of the difficulty curves it was played
+with (see ``difficulty.py``). Once difficulty.json is retuned, re-running it
+would play a different game, so such replays are refused rather than
+reported as a mismatch.
+
+Finished games are kept in a ``ReplayArchive``, which writes them on a
+background thread, so game over never waits on the disk, and keeps only the
+latest ones.
+
+Usage: python replay.py REPLAY.json [REPLAY.json ...]
+"""
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from simulation import Simulation
+
+
+class Replay:
+    """The seed and player inputs of a single game."""
+
+    VERSION = 1
+    DIRECTIONS = {
+        "U": (0, -1),
+        "D": (0, 1),
+        "L": (-1, 0),
+        "R": (1, 0)
+    }
+
+    def __init__(self, seed, secret=False, grid_dimensions=(20, 20),
+                 moves=(), ticks=0, score=0, game_over=False,
+                 difficulty=None):
+        """
+        Initialize replay from a seed and (tick, dx, dy) moves.
+        difficulty is the digest of the curves the game was played with.
+        """
+        self.seed = seed
+        self.secret = secret
+        self.grid_dimensions = tuple(grid_dimensions)
+        self.moves = list(moves)
+        self.ticks = ticks
+        self.score = score
+        self.game_over = game_over
+        self.difficulty = difficulty
+
+    @classmethod
+    def from_simulation(cls, sim):
+        """Record the replay of a simulation, finished or not."""
+        return cls(seed=sim.seed,
+                   secret=sim.secret,
+                   grid_dimensions=sim.grid_dimensions,
+                   moves=sim.moves,
+                   ticks=sim.tick,
+                   score=round(sim.score),
+                   game_over=sim.game_over,
+                   difficulty=sim.difficulty.digest)
+
+    def encode_moves(self):
+        """Pack the moves into a compact string."""
+        names = {delta: name for name, delta in self.DIRECTIONS.items()}
+        tokens = []
+        last_tick = 0
+        for tick, dx, dy in self.moves:
+            tokens.append(f"{tick - last_tick}{names[(dx, dy)]}")
+            last_tick = tick
+        return " ".join(tokens)
+
+    @classmethod
+    def decode_moves(cls, text):
+        """Unpack moves packed by encode_moves."""
+        moves = []
+        tick = 0
+        for token in text.split():
+            tick += int(token[:-1])
+            dx, dy = cls.DIRECTIONS[token[-1]]
+            moves.append((tick, dx, dy))
+        return moves
+
+    def to_dict(self):
+        """Convert the replay to plain data for JSON."""
+        return {
+            "version": self.VERSION,
+            "seed": self.seed,
+            "secret": self.secret,
+            "grid": list(self.grid_dimensions),
+            "ticks": self.ticks,
+            "score": self.score,
+            "game_over": self.game_over,
+            "difficulty": self.difficulty,
+            "moves": self.encode_moves()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a replay from data made by to_dict."""
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        return cls(seed=data["seed"],
+                   secret=data["secret"],
+                   grid_dimensions=data["grid"],
+                   moves=cls.decode_moves(data["moves"]),
+                   ticks=data["ticks"],
+                   score=data["score"],
+                   game_over=data["game_over"],
+                   difficulty=data["difficulty"])
+
+    def save(self, filename):
+        """Save replay to a JSON file."""
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filename):
+        """Load replay from a JSON file."""
+        with open(filename, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    def simulate(self):
+        """
+        Re-run the game headless, returning the finished simulation.
+        Raises ValueError if the difficulty curves have changed since.
+        """
+        sim = Simulation(grid_dimensions=self.grid_dimensions,
+                         secret=self.secret,
+                         seed=self.seed)
+        if sim.difficulty.digest != self.difficulty:
+            raise ValueError("played with other difficulty curves")
+        moves = self.moves
+        next_move = 0
+
+        while not sim.game_over and (
+                sim.tick < self.ticks or
+                (self.game_over and sim.tick == self.ticks)):
+            # Moves made before this tick was stepped
+            while (next_move < len(moves) and
+                   moves[next_move][0] == sim.tick):
+                _, dx, dy = moves[next_move]
+                sim.move_player(dx, dy)
+                next_move += 1
+            sim.step()
+
+        return sim
+
+    def verify(self):
+        """Check that re-running the game gives the recorded result."""
+        sim = self.simulate()
+        return (sim.tick == self.ticks and
+                sim.game_over == self.game_over and
+                round(sim.score) == self.score)
+
+
+class ReplayArchive:
+    """Replays of finished games in a directory, keeping the latest ones."""
+
+    def __init__(self, directory, keep=100):
+        """Initialize archive, keeping the newest keep replays."""
+        self.directory = directory
+        self.keep = keep
+        self.error = None  # Last error of the writer, if any
+
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(target=self._write, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def save(self, replay):
+        """Save a replay in the background, returning its filename."""
+        # Timestamps first, so names sort oldest first
+        filename = os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{replay.seed}.json")
+        self.writes.put((replay, filename))
+        return filename
+
+    def prune(self):
+        """Delete all but the newest keep replays."""
+        replays = sorted(name for name in os.listdir(self.directory)
+                         if name.endswith(".json"))
+        for name in replays[:-self.keep]:
+            os.remove(os.path.join(self.directory, name))
+
+    def _write(self):
+        """Carry out queued saves until closed."""
+        while True:
+            write = self.writes.get()
+            try:
+                if write is None:
+                    return
+                replay, filename = write
+                try:
+                    os.makedirs(self.directory, exist_ok=True)
+                    replay.save(filename)
+                    self.prune()
+                except OSError as error:
+                    # Game over must not fail on disk errors
+                    self.error = error
+            finally:
+                self.writes.task_done()
+
+    def flush(self):
+        """Wait until every replay saved so far is on disk."""
+        self.writes.join()
+
+    def close(self):
+        """Stop the writer once every replay is saved."""
+        if not self.writer.is_alive():
+            return
+        self.writes.put(None)
+        self.writer.join()
+
+
+def main(filenames):
+    """Replay every file at full speed and report whether it checks out."""
+    all_valid = True
+    for filename in filenames:
+        replay = Replay.load(filename)
+        start = time.perf_counter()
+        try:
+            valid = replay.verify()
+        except ValueError as error:
+            all_valid = False
+            print(f"{filename}: REFUSED, {error}")
+            continue
+        elapsed = time.perf_counter() - start
+
+        all_valid = all_valid and valid
+        print(f"{filename}: {'OK' if valid else 'MISMATCH'} "
+              f"score={replay.score} ticks={replay.ticks} "
+              f"({replay.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    return 0 if all_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""Timer registry for Fire Up! game.
+
+Every periodic task of the game (the game loop, the menu animation, the
+boss key clock) is scheduled by name through one ``Scheduler``, on top of
+Tk's ``after``. Scheduling a task that is already pending replaces the
+pending call, so a task can never end up running twice over, and changing
+screens cancels everything in one go. A task that does not schedule itself
+again simply stops, so nothing wakes the process up while it is paused.
+"""
+import time
+
+
+class Scheduler:
+    """Named tasks on a Tk root, at most one pending call per name."""
+
+    def __init__(self, root):
+        """Initialize scheduler with nothing pending."""
+        self.root = root
+        self.pending = {}  # name -> after id
+        self.wakeups = 0  # calls run, for developer stats
+
+    def schedule(self, name, delay_ms, function, *args):
+        """Run function after delay_ms, replacing any pending call of name."""
+        self.cancel(name)
+        self.pending[name] = self.root.after(
+            max(0, int(delay_ms)), self._run, name, function, args)
+
+    def schedule_on_second(self, name, function, *args):
+        """Run function just after the next wall clock second starts."""
+        # +1 ms so the clock reads the new second, not the end of the last
+        delay_ms = 1000 - int(time.time() * 1000) % 1000 + 1
+        self.schedule(name, delay_ms, function, *args)
+
+    def _run(self, name, function, args):
+        """Run a scheduled call."""
+        del self.pending[name]
+        self.wakeups += 1
+        function(*args)
+
+    def is_scheduled(self, name):
+        """Check if a call of name is pending."""
+        return name in self.pending
+
+    def cancel(self, name):
+        """Cancel the pending call of name, if any."""
+        after_id = self.pending.pop(name, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+    def cancel_all(self):
+        """Cancel every pending call, e.g. when the screen changes."""
+        for name in list(self.pending):
+            self.cancel(name)
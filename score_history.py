@@ -0,0 +1,155 @@
+"""SQLite score history for Fire Up! game.
+
+An alternative to the leaderboard tables of ``leaderboard.py`` which keeps
+every game ever played, not only the best ones: when it was played, the
+mode, final score, ticks survived, the most enemies on the board at once
+and the seed to replay it from.
+
+Indexes on (mode, score) and (mode, timestamp) keep top-N, percentile and
+per-day queries from scanning the whole table. The queries are fixed SQL
+with parameters, which sqlite3 prepares once per connection and reuses.
+
+Usage: python score_history.py [DATABASE] [--mode MODE] [--top N]
+"""
+import argparse
+import sqlite3
+import time
+
+DEFAULT_DATABASE = "score_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER,
+    peak_enemies INTEGER,
+    seed INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (mode, score);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (mode, timestamp);
+"""
+
+INSERT_RUN = """
+INSERT INTO runs (timestamp, mode, score, ticks, peak_enemies, seed, duration)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+TOP_SCORES = """
+SELECT score FROM runs WHERE mode = ? ORDER BY score DESC LIMIT ?
+"""
+TOP_RUNS = """
+SELECT timestamp, score, ticks, peak_enemies, seed, duration
+FROM runs WHERE mode = ? ORDER BY score DESC LIMIT ?
+"""
+COUNT_RUNS = """
+SELECT COUNT(*) FROM runs WHERE mode = ?
+"""
+SCORE_AT_RANK = """
+SELECT score FROM runs WHERE mode = ? ORDER BY score LIMIT 1 OFFSET ?
+"""
+COUNT_BELOW = """
+SELECT COUNT(*) FROM runs WHERE mode = ? AND score < ?
+"""
+PER_DAY = """
+SELECT date(timestamp, 'unixepoch', 'localtime') AS day,
+       COUNT(*), MAX(score), AVG(score), MAX(peak_enemies)
+FROM runs WHERE mode = ? AND timestamp >= ?
+GROUP BY day ORDER BY day
+"""
+
+
+class ScoreHistory:
+    """Every finished game, in an SQLite database."""
+
+    def __init__(self, filename=DEFAULT_DATABASE):
+        """Open the database, creating its tables if needed."""
+        self.connection = sqlite3.connect(filename)
+        # Writing one row must not stall game over
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def record(self, mode, score, seed=None, ticks=None, peak_enemies=None,
+               duration=None):
+        """Record a finished game."""
+        with self.connection:
+            self.connection.execute(
+                INSERT_RUN,
+                (time.time(), mode, score, ticks, peak_enemies, seed,
+                 duration))
+
+    def top_scores(self, mode, count=3):
+        """Get the best count scores of a mode, best first."""
+        return [score for score, in
+                self.connection.execute(TOP_SCORES, (mode, count))]
+
+    def top_runs(self, mode, count=10):
+        """Get the best count games of a mode as dicts, best first."""
+        cursor = self.connection.execute(TOP_RUNS, (mode, count))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def count(self, mode):
+        """Get the number of games played in a mode."""
+        return self.connection.execute(COUNT_RUNS, (mode,)).fetchone()[0]
+
+    def percentile(self, mode, percent):
+        """Get the score that percent of the games of a mode reached."""
+        count = self.count(mode)
+        if not count:
+            return None
+        rank = round((count - 1) * percent / 100)
+        return self.connection.execute(
+            SCORE_AT_RANK, (mode, rank)).fetchone()[0]
+
+    def percentile_rank(self, mode, score):
+        """Get the percentage of games of a mode that scored less."""
+        count = self.count(mode)
+        if not count:
+            return None
+        below = self.connection.execute(
+            COUNT_BELOW, (mode, score)).fetchone()[0]
+        return 100 * below / count
+
+    def per_day(self, mode, since=0):
+        """Get (day, games, best, mean, peak enemies) for every day played."""
+        return self.connection.execute(PER_DAY, (mode, since)).fetchall()
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+
+def main():
+    """Print a summary of the score history."""
+    parser = argparse.ArgumentParser(description="Fire Up! score history")
+    parser.add_argument("database", nargs="?", default=DEFAULT_DATABASE)
+    parser.add_argument("--mode", default="normal",
+                        choices=("normal", "secret"))
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of best games to list")
+    args = parser.parse_args()
+
+    history = ScoreHistory(args.database)
+    print(f"{history.count(args.mode)} {args.mode} games")
+    for percent in (50, 90, 99):
+        print(f"  p{percent}: {history.percentile(args.mode, percent)}")
+
+    print(f"\nBest {args.top}:")
+    for run in history.top_runs(args.mode, args.top):
+        played = time.strftime("%Y-%m-%d %H:%M",
+                               time.localtime(run["timestamp"]))
+        print(f"  {run['score']:6d}  {played}  ticks={run['ticks']} "
+              f"peak={run['peak_enemies']} seed={run['seed']}")
+
+    print("\nPer day:")
+    for day, games, best, mean, peak in history.per_day(args.mode):
+        print(f"  {day}  games={games} best={best} mean={mean:.1f} "
+              f"peak={peak}")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Headless game simulation for Fire Up! game.
+
+Holds everything a game needs to run without a window: the player, the
+enemies, spawning, collisions, difficulty and score. Each call to ``step``
+advances the game by one tick. The Tkinter ``Game`` only renders this state,
+so games can also be run without a display, e.g. for tests and balancing.
+
+All randomness comes from a per-game ``random.Random`` seeded with ``seed``,
+and every player move is recorded against the tick it happened on, so a game
+can be replayed exactly from its seed and moves (see ``replay.py``).
+"""
+import random
+import enemy  # custom module
+from difficulty import load_difficulty
+from enemy_store import EnemyStore
+from occupancy import OccupancyGrid
+from pathing import FlowField
+from spawning import SpawnScheduler
+
+
+class Simulation:
+    """State and rules of a single game, advanced one tick at a time."""
+
+    ENEMY_CLASSES = {
+        "basic": enemy.Basic,
+        "speedy": enemy.Speedy,
+        "leaper": enemy.Leaper,
+        "helix": enemy.Helix,
+        "sine": enemy.Sine,
+        "exploder": enemy.Exploder,
+        "tracker": enemy.Tracker
+    }
+
+    # Trackers further from the player than this head straight for it
+    PURSUIT_RADIUS = 32
+
+    def __init__(self, grid_dimensions=(20, 20), cell_size=15, secret=False,
+                 seed=None, enemy_backend="objects", difficulty=None,
+                 smart_trackers=False):
+        """
+        Initialize a new game on a grid of the given (columns, rows).
+        enemy_backend is "objects" for one enemy.Enemy per enemy, or
+        "arrays" to keep them in an EnemyStore, which needs NumPy.
+        difficulty defaults to the curves of the mode in difficulty.json.
+        smart_trackers makes trackers route around other enemies.
+        """
+        self.grid_dimensions = grid_dimensions
+        self.cell_size = cell_size
+        self.secret = secret
+
+        # Same seed and same moves give the same game
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.moves = []  # (tick, dx, dy) for every move made
+
+        # Metrics
+        self.score = 0
+        self.tick = 0
+        self.game_over = False
+        self.peak_enemies = 0  # Most enemies on the board at once
+
+        # Player and enemy stuffs
+        self.player_coordinates = (self.grid_dimensions[0] // 2,
+                                   # Start in middle of grid
+                                   self.grid_dimensions[1] // 2)
+        self.enemies = []
+        self.trackers = 0  # Trackers among the enemies
+        # Culled enemies are kept to respawn from
+        columns = (0, self.grid_dimensions[0])
+        rows = (0, self.grid_dimensions[1])
+        self.pool = enemy.EnemyPool(columns, self.cell_size, self.rng, rows)
+        self.occupancy = OccupancyGrid(self.grid_dimensions)
+        # Every tracker finds its way to the player through this
+        self.pursuit = FlowField(
+            self.grid_dimensions,
+            self.occupancy if smart_trackers else None,
+            self.PURSUIT_RADIUS)
+        self.store = None
+        if enemy_backend == "arrays":
+            self.store = EnemyStore(columns, self.cell_size, self.occupancy,
+                                    self.rng, rows)
+        elif enemy_backend != "objects":
+            raise ValueError(f"Unknown enemy backend: {enemy_backend}")
+        self.enemy_directions = ["U", "D", "L", "R"]
+
+        # Spawn chances follow the curves of the mode, see difficulty.py
+        if difficulty is None:
+            difficulty = load_difficulty("secret" if secret else "normal")
+        self.difficulty = difficulty
+        self.level = None
+        self.chances = dict(difficulty.starting_chances)
+
+        # Upcoming spawns, drawn from the chances
+        self.spawner = SpawnScheduler(self.rng)
+        for kind, chance in self.chances.items():
+            self.spawner.set_chance(kind, chance, self.tick)
+
+    def move_player(self, dx, dy):
+        """Move the player cube in a certain direction."""
+        new_x = self.player_coordinates[0] + dx
+        new_y = self.player_coordinates[1] + dy
+
+        # Check if the new position is within bounds
+        if (0 <= new_x < self.grid_dimensions[0] and
+                # Start from row 2 to stay below the score area
+                2 <= new_y < self.grid_dimensions[1]):
+            self.player_coordinates = (new_x, new_y)
+            self.moves.append((self.tick, dx, dy))
+
+    def step(self):
+        """
+        Advance the game by one tick.
+        Returns False once the player has been hit.
+        """
+        if self.game_over:
+            return False
+
+        self.spawn_enemies()
+        self.peak_enemies = max(self.peak_enemies, self.enemy_count())
+
+        # Check if any enemy has collided with the player
+        if self.occupancy.occupied(*self.player_coordinates):
+            self.game_over = True
+            return False
+
+        self.update_enemies()
+
+        # Change difficulty when needed
+        self.difficulty_change()
+
+        self.score += 0.1
+        self.tick += 1
+        return True
+
+    def spawn_enemies(self):
+        """Spawn the enemies scheduled for this tick."""
+        for kind, stats in self.spawner.due(self.tick):
+            if kind == "tracker" and not (
+                    stats and "track_delay" in stats and "max_moves" in stats):
+                # SECRET TRACKER ENEMY gets random pursuit stats, where
+                # not scripted with its own
+                tracker_stat = self.rng.randint(2, 10)
+                stats = {"track_delay": max(2, tracker_stat // 2),
+                         "max_moves": tracker_stat + 4, **(stats or {})}
+            self.spawn_enemy(kind, **(stats or {}))
+
+    def schedule_wave(self, kind, tick, count=1, interval=0, **stats):
+        """
+        Script spawns of a kind from a tick on, on top of random ones.
+        Trackers scripted without track_delay or max_moves get random ones.
+        """
+        self.spawner.schedule(kind, tick, count, interval, **stats)
+
+    def spawn_enemy(self, kind, **stats):
+        """Spawn one enemy of a kind, moving in a random direction."""
+        direction = self.rng.choice(self.enemy_directions)
+
+        if self.store is not None:
+            self.store.spawn(kind, direction, **stats)
+            return
+
+        enemy_instance = self.pool.acquire(self.ENEMY_CLASSES[kind],
+                                           direction, **stats)
+        if kind == "tracker":
+            enemy_instance.follow(self.pursuit)
+            self.trackers += 1
+        self.add_enemy(enemy_instance)
+
+    def add_enemy(self, enemy_instance):
+        """Add a spawned enemy to the game."""
+        self.enemies.append(enemy_instance)
+        self.stamp(enemy_instance)
+
+    def stamp(self, enemy_instance):
+        """Update the cells an enemy covers in the occupancy grid."""
+        cells = enemy_instance.cells()
+        if cells != enemy_instance.stamped_cells:
+            self.occupancy.remove(enemy_instance.stamped_cells)
+            self.occupancy.add(cells)
+            enemy_instance.stamped_cells = cells
+
+    def update_enemies(self):
+        """Remove enemies out of bounds and move the rest."""
+        # Only trackers follow the field, so it is not searched without any
+        if self.tracker_count():
+            self.pursuit.update(self.player_coordinates)
+        if self.store is not None:
+            self.store.update(self.pursuit)
+            return
+
+        # Area familiarisation
+        enemies = self.enemies
+        i = 0
+        while i < len(enemies):
+            enemy_instance = enemies[i]
+            # Check if enemy has gone off the boundaries
+            if enemy_instance.check_boundaries():
+                self.occupancy.remove(enemy_instance.stamped_cells)
+                # Move the last enemy into its place, it is updated next
+                last = enemies.pop()
+                if last is not enemy_instance:
+                    enemies[i] = last
+                if isinstance(enemy_instance, enemy.Tracker):
+                    self.trackers -= 1
+                self.pool.release(enemy_instance)
+                continue
+
+            enemy_instance.move()
+
+            # Enemies only change cells on the tick they move
+            if enemy_instance.move_gauge == 0:
+                self.stamp(enemy_instance)
+            i += 1
+
+    def enemy_count(self):
+        """Get the number of enemies in the game."""
+        if self.store is not None:
+            return len(self.store)
+        return len(self.enemies)
+
+    def tracker_count(self):
+        """Get the number of trackers in the game."""
+        if self.store is not None:
+            return self.store.count("tracker")
+        return self.trackers
+
+    def display_enemies(self, renderer, viewport=None):
+        """
+        Display enemies through the renderer.
+        viewport, if given, is the (left, top, right, bottom) cells in view;
+        enemies further than a blast away from it are skipped.
+        """
+        if self.store is not None:
+            self.store.display(renderer, viewport)
+            return
+        if viewport is None:
+            for enemy_instance in self.enemies:
+                enemy_instance.display(renderer)
+            return
+        left, top, right, bottom = viewport
+        # Explosions and helix points reach up to 2 cells from coordinates
+        left, top, right, bottom = left - 2, top - 2, right + 2, bottom + 2
+        for enemy_instance in self.enemies:
+            x, y = enemy_instance.coordinates
+            if left <= x < right and top <= y < bottom:
+                enemy_instance.display(renderer)
+
+    def difficulty_change(self):
+        """
+        Change difficulty relative to score, or tick.
+        """
+        level = (int(self.score) if self.difficulty.over == "score"
+                 else self.tick)
+        if level != self.level:
+            self.level = level
+            self.chances = self.difficulty.chances_at(level)
+            # New chances apply from the next tick
+            for kind, chance in self.chances.items():
+                self.spawner.set_chance(kind, chance, self.tick + 1)
@@ -0,0 +1,79 @@
+"""Spawn scheduler for Fire Up! game.
+
+Rolling a one in ``chance`` die for every enemy kind on every tick means
+the ticks between two spawns of a kind follow a geometric distribution. The
+scheduler samples that gap once per spawn instead and keeps the upcoming
+spawns of every kind in a priority queue, so most ticks need no random
+numbers at all.
+
+The geometric distribution is memoryless, so when a chance changes the
+next spawn of that kind can simply be drawn again from the new chance,
+which keeps spawning statistically the same as rolling every tick.
+
+Scripted spawns, e.g. waves or bursts, can be queued for any tick too.
+"""
+import heapq
+import math
+
+
+class SpawnScheduler:
+    """Priority queue of upcoming spawns of every enemy kind."""
+
+    def __init__(self, rng):
+        """Initialize an empty schedule drawing from rng."""
+        self.rng = rng
+        self.queue = []  # (tick, kind order, sequence, kind, stats, draw)
+        self.order = {}  # kind -> order to spawn in on the same tick
+        self.chances = {}  # kind -> current chance
+        self.draws = {}  # kind -> number of the latest random draw
+        self.sequence = 0
+
+    def _push(self, tick, kind, stats, draw):
+        """Queue a spawn."""
+        self.sequence += 1
+        heapq.heappush(self.queue, (tick, self.order[kind], self.sequence,
+                                    kind, stats, draw))
+
+    def _draw_next(self, kind, tick):
+        """Draw the next random spawn of a kind, on or after tick."""
+        chance = self.chances[kind]
+        if chance <= 1:
+            gap = 0
+        else:
+            # Failed rolls before the first success, one roll per tick
+            roll = 1.0 - self.rng.random()  # in (0, 1]
+            gap = int(math.log(roll) / math.log(1 - 1 / chance))
+        self.draws[kind] += 1
+        self._push(tick + gap, kind, None, self.draws[kind])
+
+    def set_chance(self, kind, chance, tick):
+        """Spawn a kind with one in chance odds per tick, from tick on."""
+        if kind not in self.order:
+            self.order[kind] = len(self.order)
+            self.draws[kind] = 0
+        if self.chances.get(kind) == chance:
+            return
+        self.chances[kind] = chance
+        # Any spawn already drawn for the old chance is dropped
+        self._draw_next(kind, tick)
+
+    def schedule(self, kind, tick, count=1, interval=0, **stats):
+        """Queue scripted spawns of a kind, e.g. for a wave or a burst."""
+        if kind not in self.order:
+            self.order[kind] = len(self.order)
+            self.draws[kind] = 0
+        for i in range(count):
+            self._push(tick + i * interval, kind, stats, None)
+
+    def due(self, tick):
+        """Get every (kind, stats) spawning on this tick, in order."""
+        spawns = []
+        queue = self.queue
+        while queue and queue[0][0] <= tick:
+            _, _, _, kind, stats, draw = heapq.heappop(queue)
+            if draw is None:
+                spawns.append((kind, stats))
+            elif draw == self.draws[kind]:
+                spawns.append((kind, None))
+                self._draw_next(kind, tick + 1)
+        return spawns
@@ -0,0 +1,97 @@
+"""Sprite atlas for Fire Up! game.
+
+Every look an enemy can have, each kind of enemy, each charge stage of an
+Exploder and its blast, and each Tracker lifetime colour at each size of
+its pulse, is listed here once by index. Enemies only pick the index of
+the sprite to show; the atlas works every sprite out once per cell size,
+as an image for the canvas renderer and as an RGB colour and box for
+the framebuffer renderer, so no colour string is made or parsed and no
+pulse is worked out while playing.
+"""
+from functools import lru_cache
+import math
+
+from PIL import Image, ImageColor
+
+# Every sprite as (fill, cells across, growth on every side in cells)
+SPRITES = []
+
+
+def _sprite(fill, cells=1, grow=0.0):
+    """Add a sprite to the list, returning its index."""
+    SPRITES.append((fill, cells, grow))
+    return len(SPRITES) - 1
+
+
+BASIC = _sprite("white")
+SPEEDY = _sprite("#f1bbb0")
+LEAPER = _sprite("#f1deb0")
+HELIX = _sprite("#fefb7f")
+SINE = _sprite("#ff005a")
+
+# Exploder charge stage for every value of its explode gauge
+EXPLODE_TIME = 10
+_CHARGE_STAGES = tuple(_sprite(colour) for colour in
+                       ('#ff0000', '#ffbb00', '#fcff00', '#3dff00'))
+CHARGE = tuple(_CHARGE_STAGES[4 * gauge // EXPLODE_TIME]
+               for gauge in range(EXPLODE_TIME))
+BLAST = _sprite("#ff8852", cells=3)
+
+# Tracker colours go from green to red over its moves, in LIFE_BUCKETS
+# steps, and its pulse grows it by up to 0.3 of a cell in PULSE_FRAMES
+LIFE_BUCKETS = 16
+PULSE_FRAMES = 8
+
+
+def _life_colour(bucket):
+    """Get the colour of a tracker with a bucket of its moves made."""
+    life_remaining = 1 - bucket / LIFE_BUCKETS
+    red = int(255 * (1 - life_remaining))
+    green = int(255 * life_remaining)
+    return f"#{red:02x}{green:02x}00"
+
+
+# TRACKER[life bucket][pulse frame], up to and including no life left
+TRACKER = tuple(
+    tuple(_sprite(_life_colour(bucket),
+                  grow=0.3 * frame / (PULSE_FRAMES - 1))
+          for frame in range(PULSE_FRAMES))
+    for bucket in range(LIFE_BUCKETS + 1))
+
+# Pulse frame for every tracker phase, |sin(phase / 10)| repeating
+# about every 63 phases
+PULSE_PERIOD = 63
+PULSE = tuple(round(abs(math.sin(phase * 0.1)) * (PULSE_FRAMES - 1))
+              for phase in range(PULSE_PERIOD))
+
+
+def life_bucket(moves_made, max_moves):
+    """Get the TRACKER row of a tracker that has made moves_made moves."""
+    return moves_made * LIFE_BUCKETS // max_moves
+
+
+class SpriteAtlas:
+    """Every sprite, drawn for one cell size."""
+
+    def __init__(self, cell_size):
+        """Draw every sprite as a PIL image, to make Tk images from."""
+        self.cell_size = cell_size
+        self.images = []
+        self.colours = []  # RGB of every sprite, all of them solid
+        # (dx, dy) of every sprite from the top left of its cell
+        self.offsets = []
+        self.sizes = []
+        for fill, cells, grow in SPRITES:
+            grow = round(grow * cell_size)
+            side = cells * cell_size + 2 * grow
+            offset = -(cells // 2) * cell_size - grow
+            self.images.append(Image.new("RGB", (side, side), fill))
+            self.colours.append(ImageColor.getrgb(fill))
+            self.offsets.append((offset, offset))
+            self.sizes.append((side, side))
+
+
+@lru_cache(maxsize=None)
+def sprite_atlas(cell_size):
+    """Get the sprite atlas for a cell size, drawn once."""
+    return SpriteAtlas(cell_size)
@@ -0,0 +1,72 @@
+"""Fixed-timestep clock for Fire Up! game.
+
+Tk's ``after`` only promises a callback no sooner than asked, so a loop
+that reschedules itself after doing its work runs slower than intended on a
+loaded machine. The clock instead measures real time with
+``time.perf_counter`` and says how many simulation steps are due, so the
+game keeps its speed and renders once per frame. When a frame is so late
+that more than ``max_steps`` are due, the extra steps are dropped rather than
+run all at once.
+"""
+import math
+import time
+
+
+class FixedTimestep:
+    """Counts the fixed-length simulation steps due in each frame."""
+
+    def __init__(self, step_time, max_steps=5, clock=time.perf_counter):
+        """Initialize clock for steps of step_time seconds."""
+        self.step_time = step_time
+        self.max_steps = max_steps
+        self.clock = clock
+
+        self.previous = None
+        self.accumulator = 0.0
+
+        # Stats
+        self.frames = 0
+        self.steps = 0
+        self.late_frames = 0  # frames that had to catch up
+        self.dropped_steps = 0  # steps skipped past max_steps
+
+    def start(self):
+        """(Re)start timing, e.g. on a new game or after a pause."""
+        self.previous = self.clock()
+        # The first frame steps straight away
+        self.accumulator = self.step_time
+
+    def advance(self):
+        """Get how many steps are due since the last frame."""
+        now = self.clock()
+        self.accumulator += now - self.previous
+        self.previous = now
+
+        steps = int(self.accumulator // self.step_time)
+        self.accumulator -= steps * self.step_time
+
+        if steps > 1:
+            self.late_frames += 1
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+
+        self.frames += 1
+        self.steps += steps
+        return steps
+
+    def delay_ms(self):
+        """Get the milliseconds until the next step is due."""
+        # Time spent since advance, e.g. rendering, counts towards it
+        elapsed = self.clock() - self.previous
+        remaining = self.step_time - self.accumulator - elapsed
+        return max(1, math.ceil(remaining * 1000))
+
+    def stats(self):
+        """Get the frame and step counts."""
+        return {
+            "frames": self.frames,
+            "steps": self.steps,
+            "late_frames": self.late_frames,
+            "dropped_steps": self.dropped_steps
+        }